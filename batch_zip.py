@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+批量转换的 zip 输入与输出
+- 输入：从上传的 zip 中逐个取出 PDF，按块读取，不整体解压到内存
+- 输出：边转换边生成 zip，每写入一块数据就发送给客户端，服务器不保存完整的压缩包
+解压、读取和压缩都在线程中执行，大批量时不阻塞事件循环上的其他请求。
+"""
+
+import asyncio
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import AsyncIterator, BinaryIO, Tuple, Union
+
+# 输出 zip 每次从结果文件读取的块大小
+ZIP_CHUNK_SIZE = 256 * 1024
+
+
+class ZipMemberReader:
+    """把 zip 内的文件包装成与 UploadFile 相同的异步读取接口"""
+
+    def __init__(self, fileobj: BinaryIO, size: int):
+        self._fileobj = fileobj
+        self.size = size
+
+    async def read(self, size: int = -1) -> bytes:
+        # 解压在线程中进行
+        return await asyncio.to_thread(self._fileobj.read, size)
+
+
+async def iter_zip_pdfs(fileobj: BinaryIO) -> AsyncIterator[Tuple[str, ZipMemberReader]]:
+    """
+    遍历 zip 中的 PDF 文件
+
+    Yields:
+        (文件名, 读取器)，文件名只保留最后一级，忽略 zip 内的目录结构
+    """
+    zf = await asyncio.to_thread(zipfile.ZipFile, fileobj)
+    with zf:
+        for info in zf.infolist():
+            path = PurePosixPath(info.filename)
+            if info.is_dir() or path.name.startswith('.') or "__MACOSX" in path.parts:
+                continue
+            if not path.name.lower().endswith('.pdf'):
+                continue
+            member = await asyncio.to_thread(zf.open, info)
+            with member:
+                yield path.name, ZipMemberReader(member, info.file_size)
+
+
+class _ZipSink:
+    """只写的输出缓冲区，生成 zip 时收集数据，由调用方及时取走"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _copy_chunk(src: BinaryIO, dest: BinaryIO) -> bool:
+    """从结果文件读取一块并压缩写入 zip，已读完时返回 False"""
+    chunk = src.read(ZIP_CHUNK_SIZE)
+    if chunk:
+        dest.write(chunk)
+    return bool(chunk)
+
+
+def unique_name(name: str, used: set) -> str:
+    """为重名文件加上序号：a.docx -> a (1).docx"""
+    candidate = name
+    stem, suffix = Path(name).stem, Path(name).suffix
+    n = 1
+    while candidate in used:
+        candidate = f"{stem} ({n}){suffix}"
+        n += 1
+    used.add(candidate)
+    return candidate
+
+
+async def stream_zip(entries: AsyncIterator[Tuple[str, Union[Path, bytes]]]) -> AsyncIterator[bytes]:
+    """
+    把 (压缩包内文件名, 文件路径或内容) 逐个写入 zip 并按块产出
+
+    输出流不可回退，zipfile 会自动使用数据描述符 (data descriptor) 记录大小和 CRC。
+    读取和压缩按块在线程中进行；同一时刻只有一个线程操作 zip，取走数据在事件循环中进行。
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        async for arcname, content in entries:
+            if isinstance(content, bytes):
+                await asyncio.to_thread(zf.writestr, arcname, content)
+            else:
+                with open(content, 'rb') as src, zf.open(arcname, 'w') as dest:
+                    while await asyncio.to_thread(_copy_chunk, src, dest):
+                        data = sink.take()
+                        if data:
+                            yield data
+            data = sink.take()
+            if data:
+                yield data
+    # 关闭时写入中央目录
+    yield sink.take()
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+转换器基准测试
+对基准语料中的每个文档分别运行 Word / PPT 转换器，记录耗时、页/秒和峰值内存，结果保存为 JSON；
+tables 子命令不经过 PDF 提取，直接把生成的大表格（默认 5000 行）写成 Word / PPT，单独测量表格输出；
+compare 子命令对比两次结果，耗时或内存增长超过阈值时标记为性能回退并以非零状态退出；
+memory 子命令检查 PDF 提取的峰值内存不随页数增长：同一语料从最少页数到最多页数，每页平均增长超过上限时以非零状态退出。
+
+每次转换都在独立的子进程中执行，峰值内存 (ru_maxrss) 不会被前一次转换污染。
+
+用法:
+    python -m benchmarks.bench run [--sizes 1,100,1000] [--kinds text,table,cjk] [--converters word,ppt]
+                                   [--backend auto] [--repeat 3] [--output 结果.json]
+    python -m benchmarks.bench tables [--rows 5000] [--cols 8] [--converters word,ppt] [--repeat 3]
+    python -m benchmarks.bench compare <基线.json> <新结果.json> [--threshold 0.1]
+    python -m benchmarks.bench memory [--sizes 100,1000] [--kinds text,table,cjk] [--backends pdfplumber,pypdf2]
+                                      [--max-kb-per-page 32]
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.corpus import CORPUS_KINDS, DEFAULT_SIZES, DEFAULT_CORPUS_DIR, build_corpus, build_table, parse_list
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不统计峰值内存
+    resource = None
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+CONVERTER_SUFFIXES = {
+    "word": ".docx",
+    "ppt": ".pptx",
+}
+
+# memory 检查的默认值：100 页到 1000 页，两种提取后端都检查，峰值内存每页平均最多增长 32 KB
+# （只测 PDF 提取，不含本来就随页数增长的输出文档；不释放 pdfplumber 页面缓存时每页增长约 1.6 MB）
+MEMORY_SIZES = (100, 1000)
+MEMORY_BACKENDS = ("pdfplumber", "pypdf2")
+MEMORY_MAX_KB_PER_PAGE = 32.0
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值常驻内存 (MB)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    if sys.platform == "darwin":
+        return round(peak / 1024 / 1024, 1)
+    return round(peak / 1024, 1)
+
+
+def _measure_once(convert_type: str, pdf_path: str, output_path: str, backend: str, page_workers: int):
+    """在子进程中执行一次转换，把测量结果以 JSON 输出到 stdout"""
+    from conversion_engine import run_conversion
+
+    started = time.perf_counter()
+    result = run_conversion(convert_type, pdf_path, output_path,
+                            {"backend": backend, "page_workers": page_workers})
+    seconds = time.perf_counter() - started
+    print(json.dumps({
+        "success": result.get("success", False),
+        "message": result.get("message", ""),
+        "pages": result.get("pages", 0),
+        "backend": result.get("backend"),
+        "seconds": seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }, ensure_ascii=False))
+
+
+def _measure_table_once(convert_type: str, rows: int, cols: int, output_path: str):
+    """在子进程中把一张生成的大表格写成文档（不经过 PDF 提取），把测量结果以 JSON 输出到 stdout"""
+    page_data = {"text": "", "tables": [build_table(rows, cols)], "backend": "pdfplumber"}
+
+    started = time.perf_counter()
+    if convert_type == "word":
+        from scripts.pdf_handler import new_document, add_page
+        doc = new_document(f"table-{rows}x{cols}")
+        add_page(doc, 1, 1, page_data)
+    else:
+        from scripts.pdf_to_ppt import add_slide
+        from scripts.pptx_writer import PptxWriter
+        doc = PptxWriter()
+        add_slide(doc, 1, 1, page_data)
+    doc.save(output_path)
+    seconds = time.perf_counter() - started
+    print(json.dumps({
+        "success": True,
+        "message": "",
+        "pages": 1,
+        "backend": None,
+        "seconds": seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }, ensure_ascii=False))
+
+
+def _measure_extract_once(convert_type: str, pdf_path: str, backend: str):
+    """在子进程中只逐页提取 PDF 内容（不生成输出文档），把测量结果以 JSON 输出到 stdout"""
+    from scripts.backends import PageSource
+    if convert_type == "word":
+        from scripts.pdf_handler import extract_page
+    else:
+        from scripts.pdf_to_ppt import extract_page
+
+    started = time.perf_counter()
+    pages = 0
+    with PageSource(pdf_path, backend) as source:
+        for analysis in source.pages():
+            extract_page(analysis)
+            pages += 1
+    seconds = time.perf_counter() - started
+    print(json.dumps({
+        "success": True,
+        "message": "",
+        "pages": pages,
+        "backend": backend,
+        "seconds": seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }, ensure_ascii=False))
+
+
+def _run_child(args: list, output_path: Optional[Path] = None) -> dict:
+    """运行 benchmarks.bench 的内部子命令并读取测量结果"""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench", *args],
+        cwd=ROOT_DIR, capture_output=True, text=True, encoding="utf-8"
+    )
+    if proc.returncode != 0:
+        return {"success": False, "message": proc.stderr.strip()[-500:], "pages": 0, "seconds": None,
+                "peak_rss_mb": None, "backend": None}
+    data = json.loads(proc.stdout.strip().splitlines()[-1])
+    data["output_bytes"] = output_path.stat().st_size if output_path is not None and output_path.exists() else 0
+    return data
+
+
+def measure(convert_type: str, pdf_path: Path, backend: str = "auto", page_workers: int = 1) -> dict:
+    """启动子进程转换一个文档并返回测量结果"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = Path(tmp_dir) / f"out{CONVERTER_SUFFIXES[convert_type]}"
+        return _run_child(["_measure", convert_type, str(pdf_path), str(output_path), backend, str(page_workers)],
+                          output_path)
+
+
+def measure_table(convert_type: str, rows: int, cols: int) -> dict:
+    """启动子进程把一张 rows x cols 的表格写成文档并返回测量结果"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = Path(tmp_dir) / f"out{CONVERTER_SUFFIXES[convert_type]}"
+        return _run_child(["_measure_table", convert_type, str(rows), str(cols), str(output_path)], output_path)
+
+
+def measure_extract(convert_type: str, pdf_path: Path, backend: str) -> dict:
+    """启动子进程只提取一个文档（转换器的逐页提取部分）并返回测量结果"""
+    return _run_child(["_measure_extract", convert_type, str(pdf_path), backend])
+
+
+def run_suite(pdf_paths: list, converters: list, backend: str = "auto", repeat: int = 1,
+              page_workers: int = 1) -> list:
+    """
+    对每个文档、每个转换器测量 repeat 次
+
+    Returns:
+        list: 每个 (转换器, 文档) 一条结果，耗时取中位数，内存取最大值
+    """
+    results = []
+    for pdf_path in pdf_paths:
+        for convert_type in converters:
+            runs = [measure(convert_type, pdf_path, backend, page_workers) for _ in range(repeat)]
+            entry = _summarize(convert_type, pdf_path.stem, runs)
+            results.append(entry)
+            _print_entry(entry)
+    return results
+
+
+def run_tables(row_counts: list, cols: int, converters: list, repeat: int = 1) -> list:
+    """
+    对每个行数、每个转换器测量 repeat 次表格输出
+
+    Returns:
+        list: 与 run_suite 格式相同，document 为 table-<行数>x<列数>
+    """
+    results = []
+    for rows in row_counts:
+        for convert_type in converters:
+            runs = [measure_table(convert_type, rows, cols) for _ in range(repeat)]
+            entry = _summarize(convert_type, f"table-{rows}x{cols}", runs)
+            results.append(entry)
+            _print_entry(entry)
+    return results
+
+
+def check_memory(corpus_dir: Path, sizes: list, kinds: list, converters: list, backends: list,
+                 max_kb_per_page: float = MEMORY_MAX_KB_PER_PAGE) -> list:
+    """
+    每种语料、每个转换器、每种提取后端分别提取最少页数和最多页数的文档，比较峰值内存
+
+    只测逐页提取：流式模式释放的是提取时的页面缓存，输出文档本身随页数增长（表格语料每页约 50-90 KB），不计入。
+
+    Returns:
+        list: [{"converter", "kind", "backend", "pages": (少页, 多页), "peak_rss_mb": (少页, 多页),
+                "growth_mb", "kb_per_page", "ok"}]
+    """
+    smallest, largest = min(sizes), max(sizes)
+    build_corpus(corpus_dir, [smallest, largest], kinds)
+    rows = []
+    for kind in kinds:
+        for convert_type in converters:
+            for backend in backends:
+                runs = [measure_extract(convert_type, corpus_dir / f"{kind}-{pages}.pdf", backend)
+                        for pages in (smallest, largest)]
+                peaks = tuple(run["peak_rss_mb"] for run in runs)
+                ok = all(run["success"] for run in runs) and None not in peaks
+                growth = peaks[1] - peaks[0] if ok else None
+                per_page = growth * 1024 / (largest - smallest) if ok else None
+                row = {
+                    "converter": convert_type,
+                    "kind": kind,
+                    "backend": backend,
+                    "pages": (smallest, largest),
+                    "peak_rss_mb": peaks,
+                    "growth_mb": round(growth, 1) if growth is not None else None,
+                    "kb_per_page": round(per_page, 1) if per_page is not None else None,
+                    "ok": ok and per_page <= max_kb_per_page,
+                }
+                rows.append(row)
+                mark = "✅" if row["ok"] else "❌"
+                detail = (f"{peaks[0]:.0f} MB -> {peaks[1]:.0f} MB (+{growth:.0f} MB，每页 {per_page:.0f} KB)" if ok
+                          else next((run["message"] for run in runs if not run["success"]), "无法统计峰值内存"))
+                print(f"{mark} {convert_type:<5} {kind:<6} {backend:<10} {smallest}->{largest} 页  {detail}")
+    return rows
+
+
+def _summarize(convert_type: str, document: str, runs: list) -> dict:
+    """多次测量合并为一条结果：耗时取中位数，内存取最大值"""
+    ok = [r for r in runs if r["success"]]
+    entry = {
+        "converter": convert_type,
+        "document": document,
+        "pages": runs[0]["pages"],
+        "success": len(ok) == len(runs),
+        "backend": runs[0]["backend"],
+        "runs": [r["seconds"] for r in runs],
+        "seconds": None,
+        "pages_per_sec": None,
+        "peak_rss_mb": None,
+        "output_bytes": ok[0]["output_bytes"] if ok else 0,
+    }
+    if ok:
+        seconds = statistics.median(r["seconds"] for r in ok)
+        rss = [r["peak_rss_mb"] for r in ok if r["peak_rss_mb"] is not None]
+        entry["seconds"] = round(seconds, 4)
+        entry["pages_per_sec"] = round(entry["pages"] / seconds, 2) if seconds > 0 else None
+        entry["peak_rss_mb"] = max(rss) if rss else None
+    else:
+        entry["message"] = runs[0]["message"]
+    return entry
+
+
+def _print_entry(entry: dict):
+    if entry["success"]:
+        rss = f"{entry['peak_rss_mb']:.0f} MB" if entry["peak_rss_mb"] is not None else "-"
+        print(f"  {entry['converter']:<5} {entry['document']:<12} {entry['pages']:>5} 页  "
+              f"{entry['seconds']:>8.3f} s  {entry['pages_per_sec']:>8.1f} 页/秒  {rss:>8}  [{entry['backend']}]")
+    else:
+        print(f"  {entry['converter']:<5} {entry['document']:<12} ❌ {entry['message'][:100]}")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True)
+    except OSError:
+        return None
+    return proc.stdout.strip() or None
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1, min_delta: float = 0.05) -> list:
+    """
+    对比两次基准测试结果
+
+    Args:
+        baseline: 基线结果
+        current: 新结果
+        threshold: 允许的相对增长（0.1 表示 10%）
+        min_delta: 耗时增长小于该秒数时不计为回退（避免极短任务的抖动）
+
+    Returns:
+        list: 每个 (转换器, 文档) 一条对比记录，regressions 列出回退的指标
+    """
+    old = {(r["converter"], r["document"]): r for r in baseline["results"]}
+    rows = []
+    for new in current["results"]:
+        key = (new["converter"], new["document"])
+        prev = old.get(key)
+        if prev is None:
+            continue
+        row = {"converter": key[0], "document": key[1], "regressions": []}
+
+        if not new["success"]:
+            if prev["success"]:
+                row["regressions"].append("failed")
+            rows.append(row)
+            continue
+        if not prev["success"]:
+            rows.append(row)
+            continue
+
+        row["seconds"] = (prev["seconds"], new["seconds"])
+        if new["seconds"] > prev["seconds"] * (1 + threshold) and new["seconds"] - prev["seconds"] >= min_delta:
+            row["regressions"].append("seconds")
+
+        if prev.get("peak_rss_mb") and new.get("peak_rss_mb"):
+            row["peak_rss_mb"] = (prev["peak_rss_mb"], new["peak_rss_mb"])
+            if new["peak_rss_mb"] > prev["peak_rss_mb"] * (1 + threshold):
+                row["regressions"].append("peak_rss_mb")
+        rows.append(row)
+    return rows
+
+
+def _change(pair, digits: int = 3) -> str:
+    if not pair:
+        return "-"
+    old, new = pair
+    return f"{old:.{digits}f} -> {new:.{digits}f} ({(new - old) / old * 100:+.1f}%)" if old else f"{old} -> {new}"
+
+
+def cmd_run(args):
+    sizes = parse_list(args.sizes, int)
+    kinds = parse_list(args.kinds)
+    converters = parse_list(args.converters)
+    for convert_type in converters:
+        if convert_type not in CONVERTER_SUFFIXES:
+            sys.exit(f"未知的转换器: {convert_type}")
+
+    print(f"生成语料: {args.corpus}")
+    pdf_paths = build_corpus(Path(args.corpus), sizes, kinds)
+
+    started = datetime.now()
+    results = run_suite(pdf_paths, converters, args.backend, args.repeat, args.page_workers)
+    _save_report(args, started, results, {"backend": args.backend, "page_workers": args.page_workers})
+
+
+def cmd_tables(args):
+    converters = parse_list(args.converters)
+    for convert_type in converters:
+        if convert_type not in CONVERTER_SUFFIXES:
+            sys.exit(f"未知的转换器: {convert_type}")
+
+    started = datetime.now()
+    results = run_tables(parse_list(args.rows, int), args.cols, converters, args.repeat)
+    _save_report(args, started, results, {"cols": args.cols}, prefix="tables")
+
+
+def _save_report(args, started: datetime, results: list, options: dict, prefix: str = "bench"):
+    """保存结果 JSON；有失败项时以非零状态退出"""
+    report = {
+        "meta": {
+            "started_at": started.isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            **options,
+        },
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{prefix}-{started:%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {output}")
+    if not all(r["success"] for r in results):
+        sys.exit(1)
+
+
+def cmd_compare(args):
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold, args.min_delta)
+    regressed = [row for row in rows if row["regressions"]]
+    for row in rows:
+        mark = "❌" if row["regressions"] else "✅"
+        print(f"{mark} {row['converter']:<5} {row['document']:<12} 耗时 {_change(row.get('seconds')):<32} "
+              f"内存 {_change(row.get('peak_rss_mb'), 1)}")
+    print(f"共 {len(rows)} 项，性能回退 {len(regressed)} 项（阈值 {args.threshold:.0%}）")
+    sys.exit(1 if regressed else 0)
+
+
+def cmd_memory(args):
+    if resource is None:
+        sys.exit("当前平台没有 resource 模块，无法统计峰值内存")
+    converters = parse_list(args.converters)
+    for convert_type in converters:
+        if convert_type not in CONVERTER_SUFFIXES:
+            sys.exit(f"未知的转换器: {convert_type}")
+
+    backends = parse_list(args.backends)
+    if len(set(parse_list(args.sizes, int))) < 2:
+        sys.exit("--sizes 至少需要两个不同的页数")
+
+    rows = check_memory(Path(args.corpus), parse_list(args.sizes, int), parse_list(args.kinds), converters,
+                        backends, args.max_kb_per_page)
+    failed = [row for row in rows if not row["ok"]]
+    print(f"共 {len(rows)} 项，未通过 {len(failed)} 项（每页峰值内存增长上限 {args.max_kb_per_page:.0f} KB）")
+    sys.exit(1 if failed else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 转换器基准测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="运行基准测试")
+    run_parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR), help="语料目录")
+    run_parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="页数列表，逗号分隔")
+    run_parser.add_argument("--kinds", default=",".join(CORPUS_KINDS), help="语料类型，逗号分隔")
+    run_parser.add_argument("--converters", default="word,ppt", help="转换器，逗号分隔")
+    run_parser.add_argument("--backend", default="auto", help="文本提取后端")
+    run_parser.add_argument("--repeat", type=int, default=1, help="每项重复次数（耗时取中位数）")
+    run_parser.add_argument("--page-workers", type=int, default=1, help="按页并行提取的进程数")
+    run_parser.add_argument("--output", help="结果文件路径（默认 benchmarks/results/bench-<时间>.json）")
+
+    tables_parser = sub.add_parser("tables", help="测量大表格的输出（不经过 PDF 提取）")
+    tables_parser.add_argument("--rows", default="5000", help="表格行数列表，逗号分隔")
+    tables_parser.add_argument("--cols", type=int, default=8, help="表格列数")
+    tables_parser.add_argument("--converters", default="word,ppt", help="转换器，逗号分隔")
+    tables_parser.add_argument("--repeat", type=int, default=1, help="每项重复次数（耗时取中位数）")
+    tables_parser.add_argument("--output", help="结果文件路径（默认 benchmarks/results/tables-<时间>.json）")
+
+    compare_parser = sub.add_parser("compare", help="对比两次基准测试结果")
+    compare_parser.add_argument("baseline", help="基线结果 JSON")
+    compare_parser.add_argument("current", help="新结果 JSON")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="允许的相对增长（默认 0.1 即 10%%）")
+    compare_parser.add_argument("--min-delta", type=float, default=0.05, help="忽略小于该秒数的耗时增长")
+
+    memory_parser = sub.add_parser("memory", help="检查 PDF 提取的峰值内存不随页数增长")
+    memory_parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR), help="语料目录")
+    memory_parser.add_argument("--sizes", default=",".join(map(str, MEMORY_SIZES)),
+                               help="页数列表，比较其中最少和最多页数的文档")
+    memory_parser.add_argument("--kinds", default=",".join(CORPUS_KINDS), help="语料类型，逗号分隔")
+    memory_parser.add_argument("--converters", default="word,ppt", help="转换器，逗号分隔")
+    memory_parser.add_argument("--backends", default=",".join(MEMORY_BACKENDS), help="文本提取后端，逗号分隔")
+    memory_parser.add_argument("--max-kb-per-page", type=float, default=MEMORY_MAX_KB_PER_PAGE,
+                               help="允许的每页平均峰值内存增长（KB）")
+
+    measure_parser = sub.add_parser("_measure")  # 内部使用：子进程中执行单次转换
+    measure_parser.add_argument("convert_type")
+    measure_parser.add_argument("pdf_path")
+    measure_parser.add_argument("output_path")
+    measure_parser.add_argument("backend")
+    measure_parser.add_argument("page_workers", type=int)
+
+    measure_extract_parser = sub.add_parser("_measure_extract")  # 内部使用：子进程中只提取单个文档
+    measure_extract_parser.add_argument("convert_type")
+    measure_extract_parser.add_argument("pdf_path")
+    measure_extract_parser.add_argument("backend")
+
+    measure_table_parser = sub.add_parser("_measure_table")  # 内部使用：子进程中输出单张表格
+    measure_table_parser.add_argument("convert_type")
+    measure_table_parser.add_argument("rows", type=int)
+    measure_table_parser.add_argument("cols", type=int)
+    measure_table_parser.add_argument("output_path")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        cmd_run(args)
+    elif args.command == "tables":
+        cmd_tables(args)
+    elif args.command == "compare":
+        cmd_compare(args)
+    elif args.command == "memory":
+        cmd_memory(args)
+    elif args.command == "_measure_extract":
+        _measure_extract_once(args.convert_type, args.pdf_path, args.backend)
+    elif args.command == "_measure_table":
+        _measure_table_once(args.convert_type, args.rows, args.cols, args.output_path)
+    else:
+        _measure_once(args.convert_type, args.pdf_path, args.output_path, args.backend, args.page_workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+基准测试语料生成
+直接按 PDF 语法写出文件，不依赖额外的库；内容由固定种子生成，同样的参数每次得到字节完全相同的文件。
+
+语料类型:
+- text: 纯文本（Helvetica）
+- table: 每页一张带边框的大表格，加少量正文
+- cjk: 中文正文（STSong-Light，UniGB-UCS2-H 编码，不嵌入字体）
+
+另有 build_table 生成内存中的大表格（不经过 PDF），用于单独测量表格输出。
+
+用法:
+    python -m benchmarks.corpus [输出目录] [--sizes 1,100,1000] [--kinds text,table,cjk]
+"""
+
+import zlib
+import random
+import argparse
+from pathlib import Path
+from typing import List, Sequence
+
+CORPUS_KINDS = ("text", "table", "cjk")
+DEFAULT_SIZES = (1, 100, 1000)
+DEFAULT_CORPUS_DIR = Path(__file__).parent / "corpus"
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+_WORDS = (
+    "report annual revenue growth market customer product service quarter result "
+    "analysis data system process value cost increase decrease total share region "
+    "team project budget plan target review summary detail change level rate period "
+    "the of and to in for with on by from as is are was be this that which"
+).split()
+
+_HANZI = (
+    "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说"
+    "产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点"
+    "从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原"
+)
+
+
+def _escape(text: str) -> str:
+    """转义 PDF 字面量字符串"""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _latin_line(x: float, y: float, size: int, text: str) -> str:
+    return f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({_escape(text)}) Tj ET\n"
+
+
+def _cjk_line(x: float, y: float, size: int, text: str) -> str:
+    # UniGB-UCS2-H 编码下每个字符为 2 字节的 UCS-2 码
+    return f"BT /F2 {size} Tf {x:.1f} {y:.1f} Td <{text.encode('utf-16-be').hex().upper()}> Tj ET\n"
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _text_page(rng: random.Random, page_num: int) -> str:
+    ops = [_latin_line(72, 790, 16, f"Chapter {page_num}: {_sentence(rng, 4)}")]
+    y = 760
+    while y > 60:
+        ops.append(_latin_line(72, y, 11, _sentence(rng, rng.randint(8, 13))))
+        y -= 15
+    return "".join(ops)
+
+
+def _table_page(rng: random.Random, page_num: int) -> str:
+    ops = [_latin_line(72, 790, 16, f"Table {page_num}: {_sentence(rng, 3)}")]
+    ops.append(_latin_line(72, 765, 11, _sentence(rng, 10)))
+
+    rows, cols = 30, 5
+    cell_w, cell_h = 90, 20
+    left, top = 72, 740
+    ops.append("0.5 w\n")
+    for r in range(rows):
+        y = top - (r + 1) * cell_h
+        for c in range(cols):
+            x = left + c * cell_w
+            ops.append(f"{x} {y} {cell_w} {cell_h} re S\n")
+            if r == 0:
+                cell = f"Column {c + 1}"
+            elif c == 0:
+                cell = f"Item {page_num}-{r}"
+            else:
+                cell = f"{rng.randint(0, 99999):,}"
+            ops.append(_latin_line(x + 4, y + 6, 9, cell))
+
+    ops.append(_latin_line(72, top - rows * cell_h - 20, 11, _sentence(rng, 10)))
+    return "".join(ops)
+
+
+def _cjk_page(rng: random.Random, page_num: int) -> str:
+    ops = [_cjk_line(72, 790, 16, f"第{page_num}章 " + "".join(rng.choice(_HANZI) for _ in range(8)))]
+    y = 760
+    while y > 60:
+        ops.append(_cjk_line(72, y, 12, "".join(rng.choice(_HANZI) for _ in range(rng.randint(25, 36))) + "。"))
+        y -= 18
+    return "".join(ops)
+
+
+_PAGE_BUILDERS = {
+    "text": _text_page,
+    "table": _table_page,
+    "cjk": _cjk_page,
+}
+
+# 每种语料页面引用的字体资源
+_PAGE_FONTS = {
+    "text": "/F1 3 0 R",
+    "table": "/F1 3 0 R",
+    "cjk": "/F2 4 0 R",
+}
+
+# 固定对象：1 目录, 2 页面树, 3 Helvetica, 4 中文 Type0 字体, 5 CID 字体, 6 字体描述
+_FIXED_OBJECTS = 6
+_FONT_OBJECTS = {
+    3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    4: "<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /UniGB-UCS2-H /DescendantFonts [5 0 R] >>",
+    5: "<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+       "/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 2 >> /FontDescriptor 6 0 R /DW 1000 >>",
+    6: "<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [-25 -254 1000 880] "
+       "/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>",
+}
+
+
+def build_pdf(kind: str, pages: int) -> bytes:
+    """
+    生成一个 PDF 文件的内容
+
+    Args:
+        kind: 语料类型 (text / table / cjk)
+        pages: 页数
+
+    Returns:
+        bytes: PDF 文件内容（同样的参数结果相同）
+    """
+    rng = random.Random(f"{kind}-{pages}")
+    build_page = _PAGE_BUILDERS[kind]
+
+    objects = {num: body.encode("latin-1") for num, body in _FONT_OBJECTS.items()}
+    page_refs = []
+    for n in range(pages):
+        page_obj = _FIXED_OBJECTS + 1 + n * 2
+        content_obj = page_obj + 1
+        page_refs.append(f"{page_obj} 0 R")
+        objects[page_obj] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {_PAGE_FONTS[kind]} >> >> /Contents {content_obj} 0 R >>"
+        ).encode("latin-1")
+        stream = zlib.compress(build_page(rng, n + 1).encode("latin-1"), 6)
+        objects[content_obj] = (
+            f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("latin-1")
+            + stream + b"\nendstream"
+        )
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {pages} >>".encode("latin-1")
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = len(out)
+        out += f"{num} 0 obj\n".encode("latin-1") + objects[num] + b"\nendobj\n"
+
+    xref_offset = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1")
+    for num in range(1, size):
+        out += f"{offsets[num]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def build_table(rows: int, cols: int = 8) -> list:
+    """
+    生成一张类似财务报表的大表格：第一列为科目，其余为各期金额，少量空单元格
+
+    Args:
+        rows: 行数（含表头）
+        cols: 列数
+
+    Returns:
+        list: 与 pdfplumber extract_tables 返回的单张表格格式相同（空单元格为 None），同样的参数结果相同
+    """
+    rng = random.Random(f"table-{rows}x{cols}")
+    table = [["Account"] + [f"Period {c}" for c in range(1, cols)]]
+    for r in range(1, rows):
+        row = [f"{1000 + r} {_sentence(rng, 3)}"]
+        for _ in range(1, cols):
+            row.append(None if rng.random() < 0.05 else f"{rng.randint(-99999, 999999):,}.{rng.randint(0, 99):02d}")
+        table.append(row)
+    return table
+
+
+def build_corpus(out_dir: Path = DEFAULT_CORPUS_DIR, sizes: Sequence[int] = DEFAULT_SIZES,
+                 kinds: Sequence[str] = CORPUS_KINDS) -> List[Path]:
+    """
+    生成基准测试语料，文件名为 <类型>-<页数>.pdf；内容未变化的文件不重写
+
+    Returns:
+        list: 生成的 PDF 路径（按类型、页数排序）
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for kind in kinds:
+        if kind not in _PAGE_BUILDERS:
+            raise ValueError(f"未知的语料类型: {kind}")
+        for pages in sizes:
+            path = out_dir / f"{kind}-{pages}.pdf"
+            data = build_pdf(kind, pages)
+            if not path.exists() or path.read_bytes() != data:
+                path.write_bytes(data)
+            paths.append(path)
+    return paths
+
+
+def parse_list(value: str, cast=str) -> list:
+    """解析逗号分隔的命令行参数"""
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成基准测试 PDF 语料")
+    parser.add_argument("out_dir", nargs="?", default=str(DEFAULT_CORPUS_DIR), help="输出目录")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="页数列表，逗号分隔")
+    parser.add_argument("--kinds", default=",".join(CORPUS_KINDS), help="语料类型，逗号分隔")
+    args = parser.parse_args()
+
+    paths = build_corpus(Path(args.out_dir), parse_list(args.sizes, int), parse_list(args.kinds))
+    for path in paths:
+        print(f"{path}  {path.stat().st_size / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
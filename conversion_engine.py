@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+转换引擎 - 在独立进程中执行 PDF 转换
+pdfplumber 版面分析和 python-docx/python-pptx 文档构建都是纯 Python 的 CPU 密集型任务，
+线程池受 GIL 限制只能用满一个核心，所以默认使用进程池，吞吐量随 CPU 核数增长。
+"""
+
+import io
+import os
+import sys
+import time
+import asyncio
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+# 转换类型 -> (模块, 函数)，按名称导入以便在子进程中使用
+CONVERTERS = {
+    "word": ("scripts.pdf_handler", "pdf_to_word"),
+    "ppt": ("scripts.pdf_to_ppt", "pdf_to_ppt"),
+}
+
+# 转换器版本（参与结果缓存键，修改转换输出时递增以使旧缓存失效）
+CONVERTER_VERSIONS = {
+    "word": "4",
+    "ppt": "4",
+}
+
+# 预热时预先解析默认模板的写入模块（每个进程只解析一次，首个任务不再承担）
+WARMUP_TEMPLATES = ("scripts.docx_writer", "scripts.pptx_writer")
+
+# 可选的文本提取后端（与 scripts/backends.py 一致；auto 按页自动选择）
+EXTRACT_BACKENDS = ("auto", "pdfplumber", "pypdf2")
+
+
+def run_conversion(convert_type: str, input_path: str, output_path: Optional[str],
+                   options: Optional[dict] = None) -> dict:
+    """
+    执行一次转换（在工作进程中运行）
+
+    Args:
+        convert_type: 转换类型 (word / ppt)
+        input_path: PDF 文件路径
+        output_path: 输出文件路径；为 None 时保存到内存，文档内容放在结果的 content 字段中返回
+        options: 传给转换函数的关键字参数（如 page_workers、backend）
+
+    Returns:
+        dict: 转换器返回的结果信息
+    """
+    module_name, func_name = CONVERTERS[convert_type]
+    converter = getattr(importlib.import_module(module_name), func_name)
+    if output_path is not None:
+        return converter(input_path, output_path, **(options or {}))
+
+    buffer = io.BytesIO()
+    result = converter(input_path, buffer, **(options or {}))
+    if result.get("success"):
+        result["content"] = buffer.getvalue()
+    return result
+
+
+# 当前进程预热耗时（秒），未预热时为 None
+_warmup_seconds = None
+
+
+def warm_up() -> float:
+    """
+    预热当前进程：导入转换模块（及 pdfplumber、python-docx、python-pptx 等依赖），预先解析 Word / PPT 默认模板
+
+    同一进程只执行一次，返回预热耗时（秒）
+    """
+    global _warmup_seconds
+    if _warmup_seconds is None:
+        started = time.perf_counter()
+        for module_name, _ in CONVERTERS.values():
+            importlib.import_module(module_name)
+        for module_name in WARMUP_TEMPLATES:
+            importlib.import_module(module_name).load_template()
+        _warmup_seconds = time.perf_counter() - started
+    return _warmup_seconds
+
+
+def _init_worker(warmup: bool):
+    """工作进程初始化：预热，避免首个任务承担导入和模板解析开销（按 max_tasks_per_child 重启的进程同样预热）"""
+    if warmup:
+        warm_up()
+
+
+def _ping() -> tuple:
+    """预热任务，返回工作进程 PID 和预热耗时"""
+    return os.getpid(), _warmup_seconds
+
+
+class ConversionEngine:
+    """转换引擎（进程池 / 线程池）"""
+
+    def __init__(self, workers: Optional[int] = None, max_tasks_per_child: Optional[int] = None,
+                 warmup: bool = True, mode: str = "process", page_workers: int = 1):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.warmup = warmup
+        self.mode = mode
+        self.page_workers = page_workers  # 单个大文件按页并行提取的进程数
+        self.startup_seconds = None  # start() 耗时（含所有工作进程启动和预热）
+        self.worker_warmup_seconds = None  # 各工作进程中最长的预热耗时
+        self._executor = None
+
+    def _create_executor(self):
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="convert")
+
+        # 统一使用 spawn，避免在事件循环运行时 fork，同时与 Windows 行为一致
+        kwargs = {
+            "max_workers": self.workers,
+            "mp_context": multiprocessing.get_context("spawn"),
+            "initializer": _init_worker,
+            "initargs": (self.warmup,),
+        }
+        # max_tasks_per_child 需要 Python 3.11+
+        if self.max_tasks_per_child and sys.version_info >= (3, 11):
+            kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+        return ProcessPoolExecutor(**kwargs)
+
+    async def start(self):
+        """启动引擎，按需预热所有工作进程"""
+        started = time.perf_counter()
+        if self._executor is None:
+            self._executor = self._create_executor()
+
+        loop = asyncio.get_running_loop()
+        if self.warmup and self.mode == "process":
+            # 进程池按需创建进程，同时提交 workers 个任务即可把进程全部拉起（初始化时各自预热）
+            pings = await asyncio.gather(*[
+                loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)
+            ])
+            self.worker_warmup_seconds = max((seconds or 0 for _, seconds in pings), default=0)
+        elif self.warmup:
+            # 线程池共用本进程的模块和模板，预热一次即可
+            self.worker_warmup_seconds = await loop.run_in_executor(self._executor, warm_up)
+        self.startup_seconds = time.perf_counter() - started
+
+    async def convert(self, convert_type: str, input_path: str, output_path: Optional[str],
+                      options: Optional[dict] = None) -> dict:
+        """在引擎中执行转换（output_path 为 None 时结果文档在 content 中返回，不写文件）"""
+        if convert_type not in CONVERTERS:
+            raise ValueError(f"不支持的转换类型: {convert_type}")
+        if self._executor is None:
+            self._executor = self._create_executor()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, run_conversion, convert_type, input_path, output_path,
+                {"page_workers": self.page_workers, **(options or {})}
+            )
+        except BrokenProcessPool:
+            # 工作进程异常退出（如内存不足被杀），重建进程池供后续请求使用
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            raise
+
+    def shutdown(self):
+        """关闭引擎"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        """引擎配置信息"""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_tasks_per_child": self.max_tasks_per_child,
+            "warmup": self.warmup,
+            "page_workers": self.page_workers,
+            "running": self._executor is not None,
+            "startup_seconds": _round(self.startup_seconds),
+            "worker_warmup_seconds": _round(self.worker_warmup_seconds),
+        }
+
+
+def _round(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds, 3) if seconds is not None else None
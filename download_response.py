@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+文件下载响应 - 断点续传与条件请求
+- 强 ETag（文件大小 + 修改时间，输出文件写入后不再修改）和 Last-Modified
+- If-None-Match：客户端已有相同文件时返回 304
+- Range：返回 206 和请求的字节区间，支持断点续传；If-Range 与当前文件不符时返回完整文件
+- HEAD：只返回响应头
+- 服务器支持 ASGI zerocopy / pathsend 扩展时交给服务器用 sendfile 发送，否则按 1 MB 分块读取发送
+
+只支持单个区间；多区间请求按 RFC 9110 的规定忽略 Range，返回完整文件。
+"""
+
+import os
+import asyncio
+from email.utils import formatdate
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Tuple
+from urllib.parse import quote
+
+import aiofiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """请求的区间超出文件范围"""
+
+
+def file_etag(stat: os.stat_result) -> str:
+    """由文件大小和修改时间生成的强 ETag"""
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 比较（弱比较：忽略 W/ 前缀）"""
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in header.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析 Range 请求头
+
+    Returns:
+        (起始, 结束)，结束不包含；格式无效或多区间时返回 None（按完整文件处理）
+
+    Raises:
+        RangeNotSatisfiable: 区间起点超出文件大小
+    """
+    units, _, spec = header.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) + 1 if last else size
+            if start >= size:
+                raise RangeNotSatisfiable()
+            if end <= start:
+                return None
+        else:
+            # bytes=-N：最后 N 个字节
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            start, end = max(size - suffix, 0), size
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size)
+
+
+def content_disposition(filename: str) -> str:
+    """附件文件名（非 ASCII 文件名使用 RFC 5987 编码）"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+class DownloadResponse(Response):
+    """支持 Range、条件请求和 HEAD 的文件响应"""
+
+    def __init__(self, path: Path, filename: str, media_type: str,
+                 on_complete: Optional[Callable[[Path], Awaitable[None]]] = None):
+        """
+        Args:
+            path: 文件路径
+            filename: 下载时显示的文件名
+            media_type: 内容类型
+            on_complete: 文件内容一直发送到末尾、且客户端未中途断开时调用（如下载后删除）
+        """
+        super().__init__(media_type=media_type)
+        self.path = Path(path)
+        self.on_complete = on_complete
+        self.headers["accept-ranges"] = "bytes"
+        self.headers["content-disposition"] = content_disposition(filename)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        try:
+            stat = await asyncio.to_thread(os.stat, self.path)
+        except FileNotFoundError:
+            # 在路由检查之后被清理
+            await Response("文件不存在", status_code=404, media_type="text/plain; charset=utf-8")(scope, receive, send)
+            return
+
+        size = stat.st_size
+        etag = file_etag(stat)
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.headers["etag"] = etag
+        self.headers["last-modified"] = last_modified
+
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            self.status_code = 304
+            if "content-length" in self.headers:
+                del self.headers["content-length"]
+            await self._send_headers(send)
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        start, end = 0, size
+        self.status_code = 200
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        # If-Range 与当前文件不一致（文件已变化）时忽略 Range，返回完整文件
+        if range_header and (if_range is None or if_range.strip() in (etag, last_modified)):
+            try:
+                byte_range = parse_range(range_header, size)
+            except RangeNotSatisfiable:
+                self.status_code = 416
+                self.headers["content-range"] = f"bytes */{size}"
+                self.headers["content-length"] = "0"
+                await self._send_headers(send)
+                await send({"type": "http.response.body", "body": b""})
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                self.status_code = 206
+                self.headers["content-range"] = f"bytes {start}-{end - 1}/{size}"
+
+        self.headers["content-length"] = str(end - start)
+        await self._send_headers(send)
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        # 发送到文件末尾才算下载完成（断点续传的最后一段也算；bytes=-N 只取末尾的探测请求不算）
+        completed = await self._send_body(scope, receive, send, start, end)
+        is_suffix_range = self.status_code == 206 and range_header.partition("=")[2].strip().startswith("-")
+        if completed and end == size and not is_suffix_range and self.on_complete is not None:
+            await self.on_complete(self.path)
+
+    async def _send_headers(self, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+    async def _send_body(self, scope: Scope, receive: Receive, send: Send, start: int, end: int) -> bool:
+        """发送 [start, end) 区间的内容，返回是否完整发送（客户端未断开）"""
+        extensions = scope.get("extensions") or {}
+
+        if "http.response.zerocopy" in extensions:
+            # 服务器支持 sendfile：直接交给内核在文件和 socket 之间复制
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopy", "file": f, "offset": start, "count": end - start})
+            return True
+        if "http.response.pathsend" in extensions and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return True
+
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        completed = False
+        try:
+            async with aiofiles.open(self.path, "rb") as f:
+                await f.seek(start)
+                remaining = end - start
+                if remaining == 0:
+                    # 空文件：没有内容块可发，也要发送结束响应的空消息
+                    completed = not disconnected.is_set()
+                    await send({"type": "http.response.body", "body": b""})
+                while remaining > 0 and not disconnected.is_set():
+                    chunk = await f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        # 文件被截断，结束响应
+                        await send({"type": "http.response.body", "body": b""})
+                        break
+                    remaining -= len(chunk)
+                    # 响应结束后服务器对 receive 也返回 disconnect，所以在发送最后一块之前判断
+                    completed = remaining == 0 and not disconnected.is_set()
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            return completed
+        finally:
+            watcher.cancel()
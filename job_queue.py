@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+转换任务队列 - 有界队列 + 固定并发
+请求只负责入队，由固定数量的后台任务从队列中取出并交给转换引擎执行；
+队列满时立即拒绝并给出建议的重试时间，避免突发流量下所有请求一起超时。
+
+多个 Web 工作进程时，每个进程执行自己接收的任务；配置 JobStore 后任务记录写入共享数据库，
+任何进程都能查询任务状态，后台清理也能看到所有进程正在使用的文件。
+"""
+
+import copy
+import math
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+from result_cache import link_or_copy
+from job_store import LEASE_SECONDS
+
+
+class QueueFullError(Exception):
+    """任务队列已满"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("转换队列已满，请稍后重试")
+        self.retry_after = retry_after
+
+
+class JobManager:
+    """转换任务管理器"""
+
+    def __init__(self, engine, concurrency: int = 4, max_queue: int = 100, history: int = 1000, cache=None,
+                 metrics=None, store=None):
+        self.engine = engine
+        self.cache = cache  # 可选的 ResultCache，成功的结果写入缓存
+        self.metrics = metrics  # 可选的 ConversionMetrics，记录排队时间、阶段耗时等指标
+        self.store = store  # 可选的 JobStore，任务记录在多个进程之间共享
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max_queue
+        self.history = history
+        self.jobs = OrderedDict()  # job_id -> 任务记录
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self._lease_task = None  # 定期为共享记录中本进程的任务续约
+        # 共享记录的读写在专用线程中按提交顺序执行（SQLite 可能等待其他进程的写锁，不能阻塞事件循环）
+        self._store_executor = (ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+                                if store is not None else None)
+        self._store_write: Optional[asyncio.Future] = None  # 最近一次提交的共享记录写入
+        self._futures = {}  # job_id -> asyncio.Future（等待结果用）
+        self._active = {}  # job_id -> (输入路径, 输出路径)，排队或执行中的任务
+        self._inflight = {}  # cache_key -> 排队或执行中的任务 ID（相同转换合并到该任务）
+        self.coalesced = 0  # 被合并、没有重复执行的转换数
+        self._followers = set()  # 跟随任务的等待协程（保留引用，避免被回收）
+        self._running = 0
+        self._avg_seconds = 5.0  # 单个任务平均耗时（指数滑动平均）
+
+    async def start(self):
+        """启动后台工作任务"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        if self.store is not None:
+            self._lease_task = asyncio.create_task(self._renew_leases())
+
+    async def stop(self):
+        """停止后台工作任务（未完成的任务标记为失败，共享记录中不会一直显示排队中）"""
+        tasks = self._workers + ([self._lease_task] if self._lease_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._lease_task = None
+        for job in self.jobs.values():
+            if job["status"] in ("queued", "running"):
+                job["status"] = "failed"
+                job["error"] = "服务已停止"
+                job["finished_at"] = datetime.now().isoformat()
+                self._persist(job)
+        if self._store_executor is not None:
+            await self.flush()
+            self._store_executor.shutdown()
+
+    def retry_after(self) -> int:
+        """按当前排队长度估算的重试等待秒数"""
+        waiting = self._queue.qsize() if self._queue else 0
+        return max(1, math.ceil(waiting / self.concurrency * self._avg_seconds))
+
+    def check_capacity(self):
+        """队列已满时抛出 QueueFullError（用于在保存上传之前提前拒绝）"""
+        if self._queue is None or self._queue.full():
+            raise QueueFullError(self.retry_after())
+
+    def in_flight(self, cache_key: str) -> bool:
+        """相同的转换是否正在排队或执行（可以合并，不占用队列名额）"""
+        return cache_key in self._inflight
+
+    def submit(self, convert_type: str, input_path: Path, output_path: Path, source_name: str,
+               cache_key: Optional[str] = None, options: Optional[dict] = None, inline: bool = False) -> dict:
+        """
+        提交转换任务
+
+        Args:
+            convert_type: 转换类型 (word / ppt)
+            input_path: 已保存的 PDF 路径（任务结束后删除）
+            output_path: 输出文件路径
+            source_name: 用户上传的原始文件名
+            cache_key: 结果缓存键，转换成功后写入缓存
+            options: 传给转换器的选项（如 backend）
+            inline: 结果只保存在内存中，由 wait_content 取回，不写入 output_path、不写入缓存
+
+        Returns:
+            dict: 任务记录
+        """
+        self.check_capacity()
+
+        job = self._register(convert_type, output_path, source_name, cache_key, options, inline)
+        self._active[job["id"]] = (input_path, output_path)
+        if cache_key:
+            self._inflight[cache_key] = job["id"]
+        self._persist(job, (input_path, output_path))
+        self._queue.put_nowait((job, input_path, output_path, time.monotonic()))
+        return job
+
+    async def submit_wait(self, convert_type: str, input_path: Path, output_path: Path, source_name: str,
+                          cache_key: Optional[str] = None, options: Optional[dict] = None) -> dict:
+        """提交转换任务，队列满时等待空位而不是拒绝（批量转换用）"""
+        job = self._register(convert_type, output_path, source_name, cache_key, options)
+        self._active[job["id"]] = (input_path, output_path)
+        if cache_key:
+            self._inflight[cache_key] = job["id"]
+        self._persist(job, (input_path, output_path))
+        try:
+            await self._queue.put((job, input_path, output_path, time.monotonic()))
+        except asyncio.CancelledError:
+            # 已合并到该任务的跟随任务在等待它的 future，先标记失败并结束 future，避免跟随任务一直等待
+            job["status"] = "failed"
+            job["error"] = "任务已取消"
+            job["finished_at"] = datetime.now().isoformat()
+            future = self._futures.pop(job["id"], None)
+            if future is not None and not future.done():
+                future.set_result(None)
+            self._active.pop(job["id"], None)
+            self._release_inflight(job)
+            self.jobs.pop(job["id"], None)
+            if self.store is not None:
+                self._store_submit(self.store.delete, job["id"])
+            raise
+        return job
+
+    def coalesce(self, convert_type: str, output_path: Path, source_name: str, cache_key: Optional[str],
+                 inline: bool = False) -> Optional[dict]:
+        """
+        相同的转换（缓存键相同）正在排队或执行时，不再重复转换，而是登记一个跟随任务等待其结果
+
+        跟随任务不占用队列名额；原任务完成后，输出文件以硬链接（或内联内容）共享给跟随任务。
+
+        Returns:
+            dict: 跟随任务记录；没有可合并的任务时返回 None
+        """
+        leader_id = self._inflight.get(cache_key) if cache_key else None
+        leader_future = self._futures.get(leader_id)
+        if leader_future is None:
+            return None
+
+        job = self._new_job(convert_type, output_path, source_name)
+        job["inline"] = inline
+        job["coalesced"] = leader_id
+        self.jobs[job["id"]] = job
+        self._futures[job["id"]] = asyncio.get_running_loop().create_future()
+        self._trim_history()
+        self.coalesced += 1
+        if self.metrics is not None:
+            self.metrics.jobs_coalesced.inc(type=convert_type)
+        self._persist(job, (output_path,))
+        leader_output = self._active[leader_id][1]
+        task = asyncio.create_task(self._follow(job, self.jobs[leader_id], leader_future, leader_output, output_path))
+        self._followers.add(task)
+        task.add_done_callback(self._followers.discard)
+        return job
+
+    def add_finished(self, convert_type: str, output_path: Path, source_name: str, result: dict,
+                     content: Optional[bytes] = None) -> dict:
+        """登记一个无需排队、已完成的任务（如命中结果缓存）；content 为内联返回的文档内容"""
+        job = self._new_job(convert_type, output_path, source_name)
+        now = datetime.now().isoformat()
+        job.update({
+            "status": "done",
+            "started_at": now,
+            "finished_at": now,
+            "result": result,
+            "cached": True,
+            "inline": content is not None,
+        })
+        self.jobs[job["id"]] = job
+        if content is not None:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(content)
+            self._futures[job["id"]] = future
+        self._persist(job)
+        self._trim_history()
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """查询任务记录（本进程没有时查共享记录，可能由其他工作进程执行）"""
+        job = self.jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = await asyncio.get_running_loop().run_in_executor(self._store_executor, self.store.get, job_id)
+        return job
+
+    async def flush(self):
+        """等待已提交的共享记录写入完成（返回任务 ID 之前调用，其他工作进程随即可以查到该任务）"""
+        if self._store_write is not None:
+            await asyncio.wait([self._store_write])
+
+    async def wait(self, job_id: str) -> dict:
+        """等待任务结束并返回任务记录"""
+        job = self.jobs.get(job_id)  # 等待期间记录可能被 _trim_history 淘汰，先保留引用
+        future = self._futures.get(job_id)
+        if future is not None:
+            await asyncio.shield(future)
+        return job if job is not None else await self.get(job_id)
+
+    def active_paths(self) -> list:
+        """
+        排队或执行中的任务使用的输入、输出文件（后台清理时跳过；有共享记录时包含所有进程的任务）
+
+        会查询共享记录，由后台清理在线程中调用。
+        """
+        paths = [path for paths in list(self._active.values()) for path in paths]
+        if self.store is not None:
+            paths.extend(Path(name) for name in self.store.active_files())
+        return paths
+
+    async def wait_content(self, job_id: str) -> Tuple[dict, Optional[bytes]]:
+        """
+        等待内联任务结束，返回任务记录和文档内容（失败时为 None）
+
+        文档内容只通过任务的 future 传递，不保存在任务记录中；应在提交后立即调用。
+        """
+        content = None
+        job = self.jobs.get(job_id)  # 等待期间记录可能被 _trim_history 淘汰，先保留引用
+        future = self._futures.get(job_id)
+        if future is not None:
+            content = await asyncio.shield(future)
+            self._futures.pop(job_id, None)
+        return job if job is not None else await self.get(job_id), content
+
+    def stats(self) -> dict:
+        """队列状态"""
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "coalesced": self.coalesced,
+            "avg_seconds": round(self._avg_seconds, 2),
+        }
+
+    def _register(self, convert_type: str, output_path: Path, source_name: str, cache_key: Optional[str],
+                  options: Optional[dict] = None, inline: bool = False) -> dict:
+        """创建任务记录并登记等待结果用的 future"""
+        job = self._new_job(convert_type, output_path, source_name)
+        job["cache_key"] = cache_key
+        job["options"] = options or {}
+        job["inline"] = inline
+        self.jobs[job["id"]] = job
+        self._futures[job["id"]] = asyncio.get_running_loop().create_future()
+        self._trim_history()
+        return job
+
+    def _new_job(self, convert_type: str, output_path: Path, source_name: str) -> dict:
+        return {
+            "id": uuid.uuid4().hex,
+            "type": convert_type,
+            "source": source_name,
+            "status": "queued",
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "filename": output_path.name,
+            "result": None,
+            "error": None,
+            "cached": False,
+            "inline": False,
+            "coalesced": None,  # 合并到的原任务 ID
+            "timings": {},  # 上传、排队等服务端阶段耗时（秒）
+        }
+
+    async def _worker(self):
+        while True:
+            job, input_path, output_path, enqueued = await self._queue.get()
+            self._running += 1
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat()
+            queue_wait = time.monotonic() - enqueued
+            job["timings"]["queue_wait"] = round(queue_wait, 4)
+            self._persist(job, (input_path, output_path))
+            if self.metrics is not None:
+                self.metrics.job_started(job, queue_wait)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            content = None
+            try:
+                result = await self.engine.convert(
+                    job["type"], str(input_path), None if job["inline"] else str(output_path), job["options"]
+                )
+                # 内联结果的文档内容只交给等待者，不留在任务记录里
+                content = result.pop("content", None)
+                job["result"] = result
+                if result.get("success"):
+                    job["status"] = "done"
+                    if self.cache is not None and job.get("cache_key") and not job["inline"]:
+                        await asyncio.to_thread(self.cache.put, job["cache_key"], output_path, result)
+                else:
+                    job["status"] = "failed"
+                    job["error"] = result.get("message")
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = str(e)
+            finally:
+                self._running -= 1
+                job["finished_at"] = datetime.now().isoformat()
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (loop.time() - started)
+                if input_path.exists():
+                    input_path.unlink()
+                self._active.pop(job["id"], None)
+                self._release_inflight(job)
+                self._persist(job)
+                if self.metrics is not None:
+                    self.metrics.job_finished(job)
+                future = self._futures.pop(job["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(content)
+                self._queue.task_done()
+
+    async def _renew_leases(self):
+        while True:
+            await asyncio.sleep(LEASE_SECONDS / 3)
+            try:
+                await asyncio.get_running_loop().run_in_executor(self._store_executor, self.store.renew)
+            except Exception as e:
+                print(f"⚠️  任务租约续期失败: {e}")
+
+    def _persist(self, job: dict, files: tuple = ()):
+        """把任务记录的快照写入共享存储（不等待写入完成）；files 为任务未结束时使用的文件"""
+        if self.store is not None:
+            self._store_submit(self.store.save, copy.deepcopy(job), files)
+
+    def _store_submit(self, func, *args):
+        """提交一次共享记录写入，写入失败时只打印警告"""
+        self._store_write = asyncio.get_running_loop().run_in_executor(self._store_executor, func, *args)
+        self._store_write.add_done_callback(_report_store_error)
+
+    def _release_inflight(self, job: dict):
+        if job.get("cache_key") and self._inflight.get(job["cache_key"]) == job["id"]:
+            del self._inflight[job["cache_key"]]
+
+    async def _follow(self, job: dict, leader: dict, leader_future: asyncio.Future, leader_output: Path,
+                      output_path: Path):
+        """等待原任务结束，共享其结果给跟随任务"""
+        content = None
+        started = time.monotonic()
+        try:
+            leader_content = await asyncio.shield(leader_future)
+            job["timings"]["coalesced_wait"] = round(time.monotonic() - started, 4)
+            job["started_at"] = leader["started_at"]
+            job["result"] = leader["result"]
+            if leader["status"] != "done":
+                job["status"] = "failed"
+                job["error"] = leader["error"]
+            elif job["inline"]:
+                if leader_content is None:
+                    leader_content = await asyncio.to_thread(leader_output.read_bytes)
+                content = leader_content
+                job["status"] = "done"
+            else:
+                if leader_content is None:
+                    await asyncio.to_thread(link_or_copy, leader_output, output_path)
+                else:
+                    await asyncio.to_thread(output_path.write_bytes, leader_content)
+                job["status"] = "done"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finished_at"] = datetime.now().isoformat()
+            self._persist(job)
+            future = self._futures.pop(job["id"], None)
+            if future is not None and not future.done():
+                future.set_result(content)
+
+    def _trim_history(self):
+        """只保留最近的任务记录，优先淘汰已结束的任务"""
+        excess = len(self.jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in list(self.jobs):
+            if excess <= 0:
+                break
+            if self.jobs[job_id]["status"] in ("done", "failed"):
+                del self.jobs[job_id]
+                excess -= 1
+
+
+def _report_store_error(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"⚠️  任务记录写入失败: {future.exception()}")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+转换任务记录存储 - SQLite (WAL)
+多个 Web 工作进程各自执行自己接收的任务，任务记录写入共享数据库，
+任何一个工作进程都能查询到其他进程提交的任务状态 (GET /jobs/{id})。
+
+未结束的任务记录带有所属进程和租约到期时间，所属进程定期续约 (renew)；
+进程被强制结束（OOM、kill -9、崩溃）后租约不再续期，到期的记录标记为失败，
+不会一直显示执行中，其输入文件也不再受保护，由后台清理回收。
+"""
+
+import os
+import json
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from state_db import StateDB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    record TEXT NOT NULL,
+    files TEXT NOT NULL DEFAULT '[]',
+    owner TEXT NOT NULL DEFAULT '',
+    lease_until REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+# 未结束的任务状态
+ACTIVE_STATUSES = ("queued", "running")
+_ACTIVE_PARAMS = ",".join("?" * len(ACTIVE_STATUSES))
+
+# 每写入多少次记录清理一次过旧的已结束任务
+TRIM_EVERY = 100
+
+# 未结束任务的租约时长（秒）；所属进程应每隔不超过其 1/3 的时间续约一次
+LEASE_SECONDS = 60
+
+
+class JobStore:
+    """任务记录存储"""
+
+    def __init__(self, path: Path, history: int = 1000):
+        """
+        Args:
+            path: 数据库文件路径
+            history: 最多保留的已结束任务数
+        """
+        self.history = history
+        self.db = StateDB(path, SCHEMA)
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"  # 本进程的标识（进程号便于排查）
+        self._saves = 0
+        self._migrate_schema()
+        # 启动时回收已退出进程遗留的未结束任务
+        self.expire()
+
+    def save(self, job: dict, files: Iterable[Path] = ()):
+        """
+        写入（或更新）任务记录
+
+        Args:
+            job: 任务记录
+            files: 任务未结束时使用的文件（输入/输出），后台清理时跳过；任务结束后不再记录
+        """
+        active = job["status"] in ACTIVE_STATUSES
+        names = [Path(path).name for path in files] if active else []
+        self.db.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, created_at, record, files, owner, lease_until)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job["id"], job["status"], job["created_at"], json.dumps(job, ensure_ascii=False), json.dumps(names),
+             self.owner, time.time() + LEASE_SECONDS if active else 0),
+        )
+        self._saves += 1
+        if self._saves % TRIM_EVERY == 0:
+            self.trim()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        rows = self.db.execute("SELECT status, record, lease_until FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        if rows[0]["status"] in ACTIVE_STATUSES and rows[0]["lease_until"] < time.time():
+            self.expire()
+            rows = self.db.execute("SELECT record FROM jobs WHERE id = ?", (job_id,))
+        return json.loads(rows[0]["record"]) if rows else None
+
+    def renew(self):
+        """为本进程所有未结束的任务续约"""
+        self.db.execute(
+            f"UPDATE jobs SET lease_until = ? WHERE owner = ? AND status IN ({_ACTIVE_PARAMS})",
+            (time.time() + LEASE_SECONDS, self.owner, *ACTIVE_STATUSES),
+        )
+
+    def expire(self) -> int:
+        """把租约已到期（所属进程已退出）的未结束任务标记为失败，返回标记的任务数"""
+        with self.db.transaction() as conn:
+            rows = conn.execute(
+                f"SELECT id, record FROM jobs WHERE status IN ({_ACTIVE_PARAMS}) AND lease_until < ?",
+                (*ACTIVE_STATUSES, time.time()),
+            ).fetchall()
+            for row in rows:
+                job = json.loads(row["record"])
+                job["status"] = "failed"
+                job["error"] = "执行任务的工作进程已退出"
+                job["finished_at"] = datetime.now().isoformat()
+                conn.execute(
+                    "UPDATE jobs SET status = ?, record = ?, files = '[]', lease_until = 0 WHERE id = ?",
+                    (job["status"], json.dumps(job, ensure_ascii=False), row["id"]),
+                )
+        return len(rows)
+
+    def delete(self, job_id: str):
+        self.db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def active_files(self) -> List[str]:
+        """所有进程中排队或执行中的任务使用的文件名（先回收租约到期的任务）"""
+        self.expire()
+        rows = self.db.execute(f"SELECT files FROM jobs WHERE status IN ({_ACTIVE_PARAMS})", ACTIVE_STATUSES)
+        return [name for row in rows for name in json.loads(row["files"])]
+
+    def trim(self):
+        """只保留最近的 history 个已结束任务"""
+        self.db.execute(
+            "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN ('done', 'failed')"
+            " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.history,),
+        )
+
+    def close(self):
+        self.db.close()
+
+    def _migrate_schema(self):
+        """旧版数据库没有 owner / lease_until 列时补上（其中未结束的任务租约为 0，随即被回收）"""
+        columns = {row["name"] for row in self.db.execute("PRAGMA table_info(jobs)")}
+        for column, definition in (("owner", "TEXT NOT NULL DEFAULT ''"), ("lease_until", "REAL NOT NULL DEFAULT 0")):
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
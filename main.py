@@ -4,24 +4,43 @@ File Converter - Web 服务主程序
 支持 PDF 转 Word 等文件格式转换
 """
 
+import time
+
+# 启动计时从导入依赖之前开始（/health 和 /metrics 中报告导入和就绪耗时）
+_IMPORT_STARTED = time.perf_counter()
+
 import os
 import uuid
 import json
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
-from fastapi import FastAPI, UploadFile, File, HTTPException, Request
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.responses import (
+    HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-import aiofiles
 import asyncio
+import zipfile
+import argparse
+
+# 转换引擎（转换模块在工作进程中导入）
+from conversion_engine import ConversionEngine, CONVERTER_VERSIONS, EXTRACT_BACKENDS
+from job_queue import JobManager, QueueFullError
+from job_store import JobStore
+from upload_stream import hash_upload, receive_upload, RequestBodyLimit, SpooledUpload, UploadTooLargeError
+from result_cache import ResultCache, link_or_copy
+from batch_zip import iter_zip_pdfs, stream_zip, unique_name
+from metrics import ConversionMetrics
+from request_store import RequestStore, InvalidCursorError
+from output_janitor import OutputJanitor
+from download_response import DownloadResponse, content_disposition, etag_matches
 
-# 导入转换模块
-from scripts.pdf_handler import pdf_to_word
-from scripts.pdf_to_ppt import pdf_to_ppt
+_IMPORTS_DONE = time.perf_counter()
 
 # 配置路径
 BASE_DIR = Path(__file__).parent
@@ -36,7 +55,91 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 STATIC_DIR.mkdir(exist_ok=True)
 DATA_DIR.mkdir(exist_ok=True)
 
-REQUESTS_FILE = DATA_DIR / "requests.json"
+REQUESTS_FILE = DATA_DIR / "requests.json"  # 旧版整体 JSON，启动时自动迁移到日志
+REQUESTS_LOG = DATA_DIR / "requests.jsonl"
+
+# 功能需求存储（只追加日志 + 内存索引）
+request_store = RequestStore(REQUESTS_LOG, legacy_path=REQUESTS_FILE)
+
+# Web 工作进程数（main() 的 --workers 参数会写入该环境变量，供各工作进程读取）
+WEB_WORKERS = max(1, int(os.environ.get("WEB_WORKERS", "1")))
+
+# 转换引擎配置（可通过环境变量覆盖）
+CONVERT_ENGINE = os.environ.get("CONVERT_ENGINE", "process")  # process / thread
+# 每个 Web 工作进程各有一个转换进程池，默认按 Web 工作进程数平分 CPU 核数
+CONVERT_WORKERS = int(os.environ.get("CONVERT_WORKERS", max(1, (os.cpu_count() or 1) // WEB_WORKERS)))
+CONVERT_MAX_TASKS_PER_CHILD = int(os.environ.get("CONVERT_MAX_TASKS_PER_CHILD", "200")) or None
+CONVERT_WARMUP = os.environ.get("CONVERT_WARMUP", "1") == "1"
+# 单个大文件按页并行提取的进程数（1 表示不拆分；与 CONVERT_WORKERS 相乘不宜超过 CPU 核数）
+PAGE_WORKERS = int(os.environ.get("PAGE_WORKERS", "1"))
+# 默认文本提取后端（auto 按页选择 PyPDF2 快速路径或 pdfplumber；请求可单独指定）
+EXTRACT_BACKEND = os.environ.get("EXTRACT_BACKEND", "auto")
+
+engine = ConversionEngine(
+    workers=CONVERT_WORKERS,
+    max_tasks_per_child=CONVERT_MAX_TASKS_PER_CHILD,
+    warmup=CONVERT_WARMUP,
+    mode=CONVERT_ENGINE,
+    page_workers=PAGE_WORKERS,
+)
+
+# 上传配置：大小上限、分块大小、内存缓冲阈值（超过后写入上传目录）
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", "200")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_MB", "8")) * 1024 * 1024
+MAX_BATCH_FILES = int(os.environ.get("MAX_BATCH_FILES", "1000"))
+# 批量转换单次请求体总大小上限
+MAX_BATCH_UPLOAD_BYTES = int(os.environ.get("MAX_BATCH_UPLOAD_MB", "2048")) * 1024 * 1024
+# multipart 边界和其他表单字段的余量（请求体比文件本身略大）
+MULTIPART_OVERHEAD = 64 * 1024
+
+# 结果缓存配置：缓存目录和总大小预算（0 表示关闭缓存）
+CACHE_DIR = OUTPUT_DIR / "cache"
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+cache = ResultCache(CACHE_DIR, CACHE_MAX_BYTES)
+
+# 任务队列配置：同时执行的转换数和最大排队数
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", CONVERT_WORKERS))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "100"))
+
+# 运行指标（/metrics）
+metrics = ConversionMetrics()
+
+# 任务记录保存在共享数据库中，多个 Web 工作进程都能查询
+JOBS_DB = DATA_DIR / "jobs.db"
+job_store = JobStore(JOBS_DB)
+
+jobs = JobManager(engine, concurrency=JOB_CONCURRENCY, max_queue=JOB_QUEUE_SIZE, cache=cache, metrics=metrics,
+                  store=job_store)
+
+# 输出文件清理：保留时间、总大小配额（0 表示不限制）、下载后删除、清理间隔
+OUTPUT_TTL_SECONDS = float(os.environ.get("OUTPUT_TTL_HOURS", "24")) * 3600
+OUTPUT_MAX_BYTES = int(os.environ.get("OUTPUT_MAX_MB", "0")) * 1024 * 1024
+DELETE_AFTER_DOWNLOAD = os.environ.get("DELETE_AFTER_DOWNLOAD", "0") == "1"
+JANITOR_INTERVAL = float(os.environ.get("JANITOR_INTERVAL_SECONDS", "300"))
+# 上传目录中超过该时间仍未被任务使用的文件视为崩溃遗留，予以删除
+ORPHAN_GRACE_SECONDS = float(os.environ.get("ORPHAN_GRACE_MINUTES", "60")) * 60
+
+janitor = OutputJanitor(
+    OUTPUT_DIR, UPLOAD_DIR,
+    ttl_seconds=OUTPUT_TTL_SECONDS,
+    max_bytes=OUTPUT_MAX_BYTES,
+    interval=JANITOR_INTERVAL,
+    delete_after_download=DELETE_AFTER_DOWNLOAD,
+    orphan_grace_seconds=ORPHAN_GRACE_SECONDS,
+    protected=jobs.active_paths,
+    metrics=metrics,
+)
+
+# 转换结果的媒体类型
+MEDIA_TYPES = {
+    "word": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "ppt": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
+
+# 启动耗时（秒）：导入模块、引擎就绪（含工作进程预热）、最长的单个工作进程预热
+startup = {"import_seconds": None, "engine_seconds": None, "worker_warmup_seconds": None, "ready_seconds": None}
 
 # 数据模型
 class FeatureRequest(BaseModel):
@@ -45,11 +148,43 @@ class FeatureRequest(BaseModel):
     contact: Optional[str] = None
     priority: str = "normal"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动和关闭转换引擎、任务队列、后台清理"""
+    if startup["import_seconds"] is None:
+        startup["import_seconds"] = round(_IMPORTS_DONE - _IMPORT_STARTED, 3)
+    ready_started = time.perf_counter()
+    await engine.start()
+    await jobs.start()
+    await janitor.start()
+    report_startup(time.perf_counter() - ready_started)
+    yield
+    await janitor.stop()
+    await jobs.stop()
+    engine.shutdown()
+    request_store.close()
+    job_store.close()
+
+
+def report_startup(ready_seconds: float):
+    """记录并打印启动耗时（转换库只在工作进程中导入，Web 进程不加载）"""
+    startup["engine_seconds"] = engine.stats()["startup_seconds"]
+    startup["worker_warmup_seconds"] = engine.stats()["worker_warmup_seconds"]
+    startup["ready_seconds"] = round(ready_seconds, 3)
+    for phase, key in (("import", "import_seconds"), ("engine", "engine_seconds"),
+                       ("worker_warmup", "worker_warmup_seconds")):
+        if startup[key] is not None:
+            metrics.startup_seconds.set(startup[key], phase=phase)
+    warmup = f"，工作进程预热 {startup['worker_warmup_seconds']:.2f}s" if startup["worker_warmup_seconds"] else ""
+    print(f"🚀 启动完成：导入 {startup['import_seconds']:.2f}s，就绪 {startup['ready_seconds']:.2f}s{warmup}")
+
+
 # 创建 FastAPI 应用
 app = FastAPI(
     title="文件转换器",
     description="PDF 转 Word 等文件格式转换工具",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # 配置 CORS
@@ -61,6 +196,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 过大的上传在读取请求体之前拒绝（否则 FastAPI 会先把整个请求体写入临时文件）
+app.add_middleware(
+    RequestBodyLimit,
+    limits={
+        **{path: MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD for path in ("/convert", "/convert/word", "/convert/ppt", "/jobs")},
+        "/convert/batch": MAX_BATCH_UPLOAD_BYTES + MULTIPART_OVERHEAD,
+    },
+)
+
 # 创建 HTML 页面
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="zh-CN">
@@ -563,120 +707,360 @@ async def read_root():
 
 
 @app.post("/convert")
-async def convert_pdf(file: UploadFile = File(...)):
+async def convert_pdf(file: UploadFile = File(...), backend: Optional[str] = Form(None),
+                      inline: bool = Form(False)):
     """处理 PDF 转 Word 请求（默认转为 Word）"""
-    return await convert_file(file, "word")
+    return await convert_file(file, "word", backend, inline)
 
 
 @app.post("/convert/ppt")
-async def convert_pdf_to_ppt(file: UploadFile = File(...)):
-    """处理 PDF 转 PPT 请求"""
-    return await convert_file(file, "ppt")
+async def convert_pdf_to_ppt(file: UploadFile = File(...), backend: Optional[str] = Form(None),
+                             inline: bool = Form(False)):
+    """处理 PDF 转 PPT 请求（inline=true 时直接在响应中返回文档）"""
+    return await convert_file(file, "ppt", backend, inline)
 
 
 @app.post("/convert/word")
-async def convert_pdf_to_word(file: UploadFile = File(...)):
-    """处理 PDF 转 Word 请求"""
-    return await convert_file(file, "word")
+async def convert_pdf_to_word(file: UploadFile = File(...), backend: Optional[str] = Form(None),
+                              inline: bool = Form(False)):
+    """处理 PDF 转 Word 请求（inline=true 时直接在响应中返回文档）"""
+    return await convert_file(file, "word", backend, inline)
 
 
-async def convert_file(file: UploadFile = File(...), convert_type: str = "word"):
-    """通用文件转换处理函数"""
-    
-    # 验证文件类型
-    if not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="只支持 PDF 文件")
+def queue_full_error(e: QueueFullError) -> HTTPException:
+    """队列已满时返回 503，并通过 Retry-After 告知客户端何时重试"""
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+def resolve_backend(backend: Optional[str]) -> str:
+    """校验请求指定的提取后端，未指定时使用默认后端"""
+    backend = backend or EXTRACT_BACKEND
+    if backend not in EXTRACT_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"不支持的提取后端: {backend}")
+    return backend
+
+
+async def bypasses_queue(file: UploadFile, convert_type: str, backend: str) -> bool:
+    """上传内容命中结果缓存、或相同转换正在进行（可合并）时不需要队列名额"""
+    sha256 = await hash_upload(file, UPLOAD_CHUNK_SIZE)
+    cache_key = ResultCache.make_key(sha256, convert_type, CONVERTER_VERSIONS[convert_type], {"backend": backend})
+    return jobs.in_flight(cache_key) or await asyncio.to_thread(cache.contains, cache_key)
+
+
+async def submit_upload(upload: SpooledUpload, source_name: str, convert_type: str, wait: bool = False,
+                        backend: str = EXTRACT_BACKEND, inline: bool = False) -> dict:
+    """
+    提交已接收的上传内容：命中结果缓存时直接返回已完成的任务，否则保存到上传目录并排队
     
+    Args:
+        upload: 已接收的上传内容
+        source_name: 原始文件名
+        convert_type: 转换类型 (word / ppt)
+        wait: 队列满时等待空位（批量转换），否则抛出 QueueFullError
+        backend: 文本提取后端
+        inline: 结果不写入输出目录，由 jobs.wait_content 取回文档内容
+    """
     # 生成唯一文件名
     file_id = str(uuid.uuid4())
-    input_filename = f"{file_id}_{file.filename}"
+    input_filename = f"{file_id}_{source_name}"
     
     if convert_type == "ppt":
-        output_filename = f"{file_id}_{file.filename.replace('.pdf', '.pptx')}"
-        output_media_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+        output_filename = f"{file_id}_{source_name.replace('.pdf', '.pptx')}"
     else:
-        output_filename = f"{file_id}_{file.filename.replace('.pdf', '.docx')}"
-        output_media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        output_filename = f"{file_id}_{source_name.replace('.pdf', '.docx')}"
     
     input_path = UPLOAD_DIR / input_filename
     output_path = OUTPUT_DIR / output_filename
     
+    # 命中结果缓存时直接返回，无需排队转换
+    options = {"backend": backend}
+    cache_key = ResultCache.make_key(upload.sha256, convert_type, CONVERTER_VERSIONS[convert_type], options)
+    cached = await asyncio.to_thread(cache.get, cache_key)
+    if cached is not None:
+        await upload.discard()
+        if inline:
+            content = await asyncio.to_thread(cached["path"].read_bytes)
+            return jobs.add_finished(convert_type, output_path, source_name, cached["result"], content=content)
+        await asyncio.to_thread(link_or_copy, cached["path"], output_path)
+        return jobs.add_finished(convert_type, output_path, source_name, cached["result"])
+    
+    await upload.save(input_path)
+    
+    # 相同文件的相同转换正在进行时，等待并共享其结果，不重复转换
+    # （在保存之后、提交之前检查，两者之间没有 await，并发的相同上传只会有一个真正提交）
+    job = jobs.coalesce(convert_type, output_path, source_name, cache_key, inline=inline)
+    if job is not None:
+        input_path.unlink(missing_ok=True)
+        return job
+    
+    # 提交任务（上传文件由任务结束后清理）
     try:
-        # 保存上传的文件
-        async with aiofiles.open(input_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        # 执行转换
-        loop = asyncio.get_event_loop()
+        if wait:
+            return await jobs.submit_wait(convert_type, input_path, output_path, source_name,
+                                          cache_key=cache_key, options=options)
+        return jobs.submit(convert_type, input_path, output_path, source_name, cache_key=cache_key, options=options,
+                           inline=inline)
+    except BaseException:
+        if input_path.exists():
+            input_path.unlink()
+        raise
+
+
+async def enqueue_conversion(file: UploadFile, convert_type: str, backend: Optional[str] = None,
+                             inline: bool = False) -> dict:
+    """校验并保存上传文件，然后提交转换任务"""
+    
+    # 验证文件类型
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="只支持 PDF 文件")
+    backend = resolve_backend(backend)
+    
+    try:
+        started = time.perf_counter()
+        # 队列已满时不保存上传，直接拒绝（命中缓存或可合并到进行中的相同转换时不占队列名额，照常处理）
+        try:
+            jobs.check_capacity()
+        except QueueFullError:
+            if not await bypasses_queue(file, convert_type, backend):
+                raise
         
-        if convert_type == "ppt":
-            result = await loop.run_in_executor(
-                None,
-                lambda: pdf_to_ppt(str(input_path), str(output_path))
-            )
-        else:
-            result = await loop.run_in_executor(
-                None,
-                lambda: pdf_to_word(str(input_path), str(output_path))
-            )
+        # 分块接收上传文件（同时计算哈希、检查大小上限）
+        upload = await receive_upload(
+            file, UPLOAD_DIR,
+            max_bytes=MAX_UPLOAD_BYTES,
+            chunk_size=UPLOAD_CHUNK_SIZE,
+            spool_threshold=UPLOAD_SPOOL_BYTES
+        )
+        job = await submit_upload(upload, file.filename, convert_type, backend=backend, inline=inline)
         
-        if result["success"]:
-            return {
-                "success": True,
-                "filename": output_filename,
-                "pages": result["pages"],
-                "message": result["message"]
-            }
-        else:
-            raise HTTPException(status_code=500, detail=result["message"])
+        # 上传阶段：接收请求体并写入上传目录
+        upload_seconds = time.perf_counter() - started
+        job["timings"]["upload"] = round(upload_seconds, 4)
+        metrics.observe_stage(convert_type, "upload", upload_seconds)
+        # 任务记录写入共享数据库后再返回，其他工作进程随即可以查询
+        await jobs.flush()
+        return job
     
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def convert_file(file: UploadFile = File(...), convert_type: str = "word", backend: Optional[str] = None,
+                       inline: bool = False):
+    """通用文件转换处理函数（提交任务并等待完成）"""
+    job = await enqueue_conversion(file, convert_type, backend, inline)
+    if inline:
+        return await inline_response(job)
+    job = await jobs.wait(job["id"])
     
-    finally:
-        # 清理上传的临时文件
-        if input_path.exists():
-            input_path.unlink()
+    if job["status"] == "done":
+        result = job["result"]
+        
+        return {
+            "success": True,
+            "filename": job["filename"],
+            "pages": result["pages"],
+            "message": result["message"],
+            "backend": result.get("backend"),
+            "cached": job["cached"],
+            "timings": job_timings(job)
+        }
+    else:
+        raise HTTPException(status_code=500, detail=job["error"])
+
 
+def job_timings(job: dict) -> dict:
+    """阶段耗时：服务端（上传、排队）+ 转换器（打开、提取、构建、保存）；命中缓存时没有转换阶段"""
+    timings = dict(job["timings"])
+    if not job["cached"]:
+        timings.update(job["result"].get("timings") or {})
+    return timings
 
-@app.get("/download/{filename}")
+
+async def inline_response(job: dict) -> Response:
+    """等待内联任务完成，把文档直接作为响应体返回（不写入输出目录），转换信息放在响应头中"""
+    job, content = await jobs.wait_content(job["id"])
+    if job["status"] != "done" or content is None:
+        raise HTTPException(status_code=500, detail=job["error"])
+    
+    result = job["result"]
+    filename = Path(job["source"]).stem + Path(job["filename"]).suffix
+    return Response(
+        content=content,
+        media_type=MEDIA_TYPES[job["type"]],
+        headers={
+            "Content-Disposition": content_disposition(filename),
+            "X-Convert-Pages": str(result["pages"]),
+            "X-Convert-Backend": str(result.get("backend")),
+            "X-Convert-Cached": "true" if job["cached"] else "false",
+            "X-Convert-Timings": json.dumps(job_timings(job), separators=(",", ":")),
+        }
+    )
+
+
+async def single_member(name: str, file: UploadFile):
+    """单个 PDF 上传，与 iter_zip_pdfs 相同的异步遍历接口"""
+    yield name, file
+
+
+@app.post("/convert/batch")
+async def convert_batch_files(files: List[UploadFile] = File(...), type: str = Form("word"),
+                              backend: Optional[str] = Form(None)):
+    """批量转换：上传多个 PDF 或一个 zip，转换结果边完成边以 zip 流返回"""
+    if type not in ("word", "ppt"):
+        raise HTTPException(status_code=400, detail="不支持的转换类型")
+    backend = resolve_backend(backend)
+    
+    # 接收所有输入（批量时直接写入磁盘，避免大量文件同时占用内存）
+    uploads = []
+    try:
+        for file in files:
+            name = file.filename or ""
+            if name.lower().endswith('.zip'):
+                members = iter_zip_pdfs(file.file)
+            elif name.lower().endswith('.pdf'):
+                members = single_member(name, file)
+            else:
+                raise HTTPException(status_code=400, detail=f"只支持 PDF 或 zip 文件: {name}")
+            
+            async for member_name, reader in members:
+                if len(uploads) >= MAX_BATCH_FILES:
+                    raise HTTPException(status_code=413, detail=f"单次最多转换 {MAX_BATCH_FILES} 个文件")
+                upload = await receive_upload(
+                    reader, UPLOAD_DIR,
+                    max_bytes=MAX_UPLOAD_BYTES,
+                    chunk_size=UPLOAD_CHUNK_SIZE,
+                    spool_threshold=0
+                )
+                uploads.append((member_name, upload))
+    except BaseException as e:
+        for _, upload in uploads:
+            await upload.discard()
+        if isinstance(e, UploadTooLargeError):
+            raise HTTPException(status_code=413, detail=str(e))
+        if isinstance(e, zipfile.BadZipFile):
+            raise HTTPException(status_code=400, detail="zip 文件已损坏")
+        raise
+    
+    if not uploads:
+        raise HTTPException(status_code=400, detail="没有可转换的 PDF 文件")
+    
+    async def run_one(source_name: str, upload: SpooledUpload):
+        try:
+            job = await submit_upload(upload, source_name, type, wait=True, backend=backend)
+            return source_name, await jobs.wait(job["id"])
+        except Exception as e:
+            return source_name, {"status": "failed", "error": str(e)}
+        finally:
+            await upload.discard()
+    
+    # 所有文件一起排队（队列满时等待空位），按完成先后写入 zip
+    tasks = [asyncio.create_task(run_one(name, upload)) for name, upload in uploads]
+    
+    async def entries():
+        used_names = set()
+        report = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                source_name, job = await next_done
+                item = {"file": source_name, "status": job["status"]}
+                if job["status"] == "done":
+                    output_suffix = Path(job["filename"]).suffix
+                    arcname = unique_name(Path(source_name).with_suffix(output_suffix).name, used_names)
+                    item["output"] = arcname
+                    item["backend"] = job["result"].get("backend")
+                    report.append(item)
+                    yield arcname, OUTPUT_DIR / job["filename"]
+                else:
+                    item["error"] = job["error"]
+                    report.append(item)
+            yield "report.json", json.dumps(report, ensure_ascii=False, indent=2).encode('utf-8')
+        finally:
+            # 客户端中途断开时取消尚未提交的文件
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(
+        stream_zip(entries()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="converted_{type}.zip"'}
+    )
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(file: UploadFile = File(...), type: str = Form("word"), backend: Optional[str] = Form(None)):
+    """提交异步转换任务，立即返回任务 ID"""
+    if type not in ("word", "ppt"):
+        raise HTTPException(status_code=400, detail="不支持的转换类型")
+    
+    job = await enqueue_conversion(file, type, backend)
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['id']}"
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """查询转换任务状态和结果"""
+    job = await jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    
+    response = dict(job)
+    if job["status"] == "done" and not job["inline"]:
+        response["download_url"] = f"/download/{job['filename']}"
+    return response
+
+
+@app.api_route("/download/{filename}", methods=["GET", "HEAD"])
 async def download_file(filename: str):
-    """下载转换后的文件"""
+    """下载转换后的文件（支持断点续传 Range、ETag 条件请求和 HEAD）"""
     file_path = OUTPUT_DIR / filename
-    if not file_path.exists():
+    if not file_path.is_file():
         raise HTTPException(status_code=404, detail="文件不存在")
     
     # 根据文件扩展名确定媒体类型
-    if filename.endswith('.pptx'):
-        media_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-    else:
-        media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    media_type = MEDIA_TYPES["ppt" if filename.endswith('.pptx') else "word"]
     
-    return FileResponse(
+    # 开启下载后删除时，文件内容发送到末尾后再删除（中途断开、只取前一段不会删除）
+    return DownloadResponse(
         path=file_path,
         filename=filename,
-        media_type=media_type
+        media_type=media_type,
+        on_complete=janitor.downloaded
     )
 
 
 @app.get("/health")
 async def health_check():
     """健康检查"""
-    return {"status": "ok", "message": "服务运行正常"}
+    return {"status": "ok", "message": "服务运行正常", "pid": os.getpid(), "web_workers": WEB_WORKERS,
+            "engine": engine.stats(), "jobs": jobs.stats(), "cache": await asyncio.to_thread(cache.stats),
+            "janitor": janitor.stats(), "startup": startup}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus 格式的运行指标"""
+    metrics.jobs_queued.set(jobs.stats()["queued"])
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.post("/api/request")
 async def submit_request(request: FeatureRequest):
     """提交功能需求"""
     try:
-        # 读取现有需求
-        requests_data = []
-        if REQUESTS_FILE.exists():
-            with open(REQUESTS_FILE, 'r', encoding='utf-8') as f:
-                requests_data = json.load(f)
-        
-        # 添加新需求
+        # 添加新需求（追加到日志末尾）
         new_request = {
             "id": str(uuid.uuid4())[:8],
             "title": request.title,
@@ -686,11 +1070,8 @@ async def submit_request(request: FeatureRequest):
             "status": "pending",
             "created_at": datetime.now().isoformat()
         }
-        requests_data.append(new_request)
-        
-        # 保存到文件
-        with open(REQUESTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(requests_data, f, ensure_ascii=False, indent=2)
+        # 写日志、fsync 和进程间文件锁都是阻塞操作，放到线程中执行，不阻塞事件循环
+        await asyncio.to_thread(request_store.create, new_request)
         
         # 打印到控制台
         priority_text = {"high": "🔥 急需", "normal": "📋 一般需求", "low": "🕐 有空再做"}
@@ -729,44 +1110,40 @@ async def submit_request(request: FeatureRequest):
 
 
 @app.get("/api/requests")
-async def get_requests():
-    """获取所有需求（管理员用）"""
-    if not REQUESTS_FILE.exists():
-        return {"requests": [], "total": 0}
+async def get_requests(request: Request, status: Optional[str] = None, priority: Optional[str] = None,
+                       limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None):
+    """获取需求列表（管理员用），按优先级和时间排序，支持筛选和游标分页"""
+    # 数据未变化时返回 304，轮询的管理页面无需重新下载
+    # 日志被其他进程修改过时要等文件锁补读，放到线程中执行
+    etag = await asyncio.to_thread(request_store.etag, status, priority, limit, cursor)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     
-    with open(REQUESTS_FILE, 'r', encoding='utf-8') as f:
-        requests_data = json.load(f)
-    
-    # 按优先级和时间排序
-    priority_order = {"high": 0, "normal": 1, "low": 2}
-    requests_data.sort(key=lambda x: (priority_order.get(x["priority"], 1), x["created_at"]))
+    try:
+        page = await asyncio.to_thread(request_store.query, status=status, priority=priority, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return {"requests": requests_data, "total": len(requests_data)}
+    return JSONResponse(page, headers={"ETag": etag})
 
 
 @app.post("/api/requests/{request_id}/implement")
 async def implement_request(request_id: str, body: dict = None):
     """标记需求为已实现"""
     try:
-        if not REQUESTS_FILE.exists():
-            raise HTTPException(status_code=404, detail="需求不存在")
-        
-        with open(REQUESTS_FILE, 'r', encoding='utf-8') as f:
-            requests_data = json.load(f)
+        # 只追加一条状态变更记录
+        changes = {
+            "status": "implemented",
+            "implemented_at": datetime.now().isoformat()
+        }
+        if body and body.get("notes"):
+            changes["notes"] = body["notes"]
         
-        for req in requests_data:
-            if req["id"] == request_id:
-                req["status"] = "implemented"
-                req["implemented_at"] = datetime.now().isoformat()
-                if body and body.get("notes"):
-                    req["notes"] = body["notes"]
-                
-                with open(REQUESTS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(requests_data, f, ensure_ascii=False, indent=2)
-                
-                return {"success": True, "message": "已标记为已实现"}
+        if await asyncio.to_thread(request_store.update, request_id, changes) is None:
+            raise HTTPException(status_code=404, detail="需求不存在")
         
-        raise HTTPException(status_code=404, detail="需求不存在")
+        return {"success": True, "message": "已标记为已实现"}
     
     except HTTPException:
         raise
@@ -790,8 +1167,15 @@ def get_local_ip():
 
 def main():
     """启动服务"""
-    host = "0.0.0.0"
-    port = 8000
+    parser = argparse.ArgumentParser(description="File Converter Web 服务")
+    parser.add_argument("--host", default="0.0.0.0", help="监听地址")
+    parser.add_argument("--port", type=int, default=8000, help="监听端口")
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS,
+                        help="Web 工作进程数（默认读取 WEB_WORKERS 环境变量，为 1）")
+    args = parser.parse_args()
+    host = args.host
+    port = args.port
+    workers = max(1, args.workers)
     
     # 获取本机 IP
     local_ip = get_local_ip()
@@ -802,9 +1186,18 @@ def main():
     print(f"\nLocal Access: http://localhost:{port}")
     print(f"LAN Access: http://{local_ip}:{port}")
     print("\nSupported: PDF -> Word (.docx)")
+    if workers > 1:
+        print(f"Web Workers: {workers}")
     print("\nPress Ctrl+C to stop\n")
     
-    uvicorn.run(app, host=host, port=port)
+    if workers == 1:
+        uvicorn.run(app, host=host, port=port)
+        return
+    
+    # 多个工作进程：uvicorn 按导入路径在每个进程中重新导入应用，
+    # 工作进程数通过环境变量传给它们（用于平分转换进程数），共享状态见 request_store / job_store / result_cache
+    os.environ["WEB_WORKERS"] = str(workers)
+    uvicorn.run("main:app", host=host, port=port, workers=workers, app_dir=str(BASE_DIR))
 
 
 if __name__ == "__main__":
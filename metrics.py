@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+运行指标 - Prometheus 文本格式
+提供最基本的计数器、仪表和直方图，在 /metrics 输出，不依赖 prometheus_client。
+所有指标只在主进程的事件循环中更新，不需要加锁。
+"""
+
+import math
+from typing import Dict, Sequence, Tuple
+
+# 耗时直方图的默认分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# 页数直方图分桶
+PAGE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Metric:
+    """指标基类：按标签值分别记录"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], **extra) -> Dict[str, str]:
+        labels = dict(zip(self.labelnames, key))
+        labels.update(extra)
+        return labels
+
+    def samples(self):
+        """返回 [(名称后缀, 标签, 值), ...]"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        return [("", self._labels(key), value) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """可增可减的当前值"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {} if labelnames else {(): 0}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        return [("", self._labels(key), value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """分桶直方图（累计分桶 + 总和 + 次数）"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values = {}  # 标签 -> [各分桶计数, 总和, 次数]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[0][i] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    def samples(self):
+        samples = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(("_bucket", self._labels(key, le=_format_value(bound)), cumulative))
+            samples.append(("_sum", self._labels(key), total))
+            samples.append(("_count", self._labels(key), count))
+        return samples
+
+
+class ConversionMetrics:
+    """转换服务的运行指标"""
+
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            "converter_stage_seconds", "转换各阶段耗时（秒）", ("type", "stage")
+        )
+        self.pages = Histogram(
+            "converter_pages", "每个转换任务的页数", ("type",), buckets=PAGE_BUCKETS
+        )
+        self.pages_total = Counter(
+            "converter_pages_total", "已转换的总页数", ("type",)
+        )
+        self.jobs_total = Counter(
+            "converter_jobs_total", "已结束的转换任务数", ("type", "status")
+        )
+        self.queue_wait_seconds = Histogram(
+            "converter_queue_wait_seconds", "任务在队列中等待的时间（秒）", ("type",)
+        )
+        self.jobs_in_flight = Gauge(
+            "converter_jobs_in_flight", "正在执行的转换任务数"
+        )
+        self.jobs_queued = Gauge(
+            "converter_jobs_queued", "排队中的转换任务数"
+        )
+        self.jobs_coalesced = Counter(
+            "converter_jobs_coalesced_total", "与进行中的相同转换合并、未重复执行的任务数", ("type",)
+        )
+        self.files_removed = Counter(
+            "converter_files_removed_total", "后台清理删除的文件数（expired/quota/downloaded/orphan）", ("reason",)
+        )
+        self.startup_seconds = Gauge(
+            "converter_startup_seconds", "服务启动耗时（秒）：import 导入模块 / engine 引擎就绪 / worker_warmup 工作进程预热",
+            ("phase",)
+        )
+        self._metrics = [
+            self.stage_seconds, self.pages, self.pages_total, self.jobs_total,
+            self.queue_wait_seconds, self.jobs_in_flight, self.jobs_queued, self.jobs_coalesced, self.files_removed,
+            self.startup_seconds,
+        ]
+
+    def observe_stage(self, convert_type: str, stage: str, seconds: float):
+        self.stage_seconds.observe(seconds, type=convert_type, stage=stage)
+
+    def job_started(self, job: dict, queue_wait: float):
+        """任务开始执行"""
+        self.jobs_in_flight.inc()
+        self.queue_wait_seconds.observe(queue_wait, type=job["type"])
+
+    def job_finished(self, job: dict):
+        """任务结束：记录结果状态、页数和转换器返回的各阶段耗时"""
+        self.jobs_in_flight.dec()
+        self.jobs_total.inc(type=job["type"], status=job["status"])
+        result = job.get("result") or {}
+        if job["status"] == "done":
+            self.pages.observe(result.get("pages", 0), type=job["type"])
+            self.pages_total.inc(result.get("pages", 0), type=job["type"])
+        for stage, seconds in (result.get("timings") or {}).items():
+            self.observe_stage(job["type"], stage, seconds)
+
+    def render(self) -> str:
+        """Prometheus 文本格式 (text/plain; version=0.0.4)"""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+输出文件生命周期管理 - 后台清理任务
+定期清理输出目录中的转换结果：超过保留时间 (TTL) 的文件删除，总大小超过配额时从最旧的开始删除；
+可选在首次下载成功后立即删除。同时清理上传目录中进程崩溃后遗留的输入文件和 .part 临时文件。
+
+正在排队或转换中的任务所用的文件不会被删除；结果缓存目录 (output/cache/) 由缓存自己按 LRU 管理，不在清理范围内。
+"""
+
+import time
+import asyncio
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Set
+
+
+class OutputJanitor:
+    """输出目录和上传目录的后台清理"""
+
+    def __init__(self, output_dir: Path, upload_dir: Path, ttl_seconds: float = 24 * 3600, max_bytes: int = 0,
+                 interval: float = 300, delete_after_download: bool = False, orphan_grace_seconds: float = 3600,
+                 protected: Optional[Callable[[], Iterable[Path]]] = None, metrics=None):
+        """
+        Args:
+            output_dir: 输出目录（只清理其中的文件，不进入子目录）
+            upload_dir: 上传目录
+            ttl_seconds: 输出文件保留时间（按修改时间），0 表示不按时间清理
+            max_bytes: 输出文件总大小上限，0 表示不限制
+            interval: 两次清理之间的间隔（秒）
+            delete_after_download: 首次下载成功后删除输出文件
+            orphan_grace_seconds: 上传目录中超过该时间未修改、且不属于任何进行中任务的文件视为遗留文件
+            protected: 返回正在使用的文件路径（进行中任务的输入/输出），这些文件不会被删除
+            metrics: 可选的 ConversionMetrics，记录删除的文件数
+        """
+        self.output_dir = Path(output_dir)
+        self.upload_dir = Path(upload_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.delete_after_download = delete_after_download
+        self.orphan_grace_seconds = orphan_grace_seconds
+        self.protected = protected or (lambda: ())
+        self.metrics = metrics
+        self.removed = {"expired": 0, "quota": 0, "downloaded": 0, "orphan": 0}
+        self._reported = dict(self.removed)  # 已计入 metrics 的删除数
+        self.removed_bytes = 0
+        self.output_bytes = 0  # 最近一次清理后输出目录的总大小
+        self.last_sweep = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """启动后台清理任务（启动时先清理一次，回收上次运行遗留的文件）"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def sweep_once(self):
+        """执行一次清理（查询进行中任务的文件和扫描目录都在线程中进行，不阻塞事件循环）"""
+        await asyncio.to_thread(self._sweep_unprotected)
+        self._report_metrics()
+
+    async def downloaded(self, path: Path):
+        """下载完成回调：开启 delete_after_download 时删除该输出文件"""
+        if self.delete_after_download:
+            await asyncio.to_thread(self._remove_downloaded, path)
+            self._report_metrics()
+
+    def sweep(self, protected: Set[str] = frozenset()):
+        """
+        清理一次
+
+        Args:
+            protected: 不能删除的文件名（进行中任务的输入/输出）
+        """
+        now = time.time()
+        self._sweep_outputs(now, protected)
+        self._sweep_uploads(now, protected)
+        self.last_sweep = now
+
+    def stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "max_bytes": self.max_bytes,
+            "delete_after_download": self.delete_after_download,
+            "output_bytes": self.output_bytes,
+            "removed": dict(self.removed),
+            "removed_bytes": self.removed_bytes,
+        }
+
+    def _report_metrics(self):
+        """把删除数增量计入 metrics（metrics 只在事件循环中更新）"""
+        if self.metrics is None:
+            return
+        for reason, count in self.removed.items():
+            if count > self._reported[reason]:
+                self.metrics.files_removed.inc(count - self._reported[reason], reason=reason)
+                self._reported[reason] = count
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep_once()
+            except Exception as e:
+                print(f"⚠️  输出目录清理失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _sweep_outputs(self, now: float, protected: Set[str]):
+        files = []
+        for path in self.output_dir.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if not path.is_file() or path.name in protected:
+                continue
+            if self.ttl_seconds and now - stat.st_mtime > self.ttl_seconds:
+                self._remove(path, "expired", stat.st_size)
+            else:
+                files.append((stat.st_mtime, path, stat.st_size))
+
+        total = sum(size for _, _, size in files)
+        if self.max_bytes:
+            # 超过配额时从最旧的文件开始删除
+            for _, path, size in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path, "quota", size)
+                total -= size
+        self.output_bytes = total
+
+    def _sweep_uploads(self, now: float, protected: Set[str]):
+        for path in self.upload_dir.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if not path.is_file() or path.name in protected:
+                continue
+            if now - stat.st_mtime > self.orphan_grace_seconds:
+                self._remove(path, "orphan", stat.st_size)
+
+    def _sweep_unprotected(self):
+        self.sweep(self._protected_names())
+
+    def _protected_names(self) -> Set[str]:
+        return {Path(path).name for path in self.protected()}
+
+    def _remove_downloaded(self, path: Path):
+        if path.name not in self._protected_names():
+            self._remove(path, "downloaded")
+
+    def _remove(self, path: Path, reason: str, size: Optional[int] = None):
+        try:
+            if size is None:
+                size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        self.removed[reason] += 1
+        self.removed_bytes += size
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+项目全文检索 - 倒排索引
+索引项目名称与描述、里程碑标题与描述、讨论内容；添加里程碑或讨论时增量更新，不需要重新扫描项目文件。
+
+分词：英文和数字按单词切分；中文等 CJK 字符没有空格分隔，索引时同时记录单字和相邻两字 (bigram)，
+查询时两个字以上的中文按 bigram 匹配（相当于短语匹配），单个字按单字匹配；
+英文和数字查询词按前缀匹配（conv 可以命中 converter），在有序词表上二分查找前缀范围。
+排序使用 BM25，所有查询词都出现的文档才算命中。
+
+索引以只追加日志 (JSONL) 持久化，每条记录是一个文档的词频或删除操作；
+其他进程（如命令行工具）追加的记录在下次查询时增量读取。
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import bisect
+import unicodedata
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 不同位置命中的权重：名称/描述 > 里程碑 > 讨论
+KIND_WEIGHTS = {
+    "project": 2.0,
+    "milestone": 1.5,
+    "discussion": 1.0,
+}
+
+_CJK = r"㐀-䶿一-鿿豈-﫿぀-ヿ가-힯"
+_TOKEN_PATTERN = re.compile(rf"[0-9a-z]+|[{_CJK}]+")
+_CJK_PATTERN = re.compile(rf"[{_CJK}]")
+
+DocKey = Tuple[str, str, Optional[int]]  # (项目名, 类型, 里程碑/讨论 ID)
+
+
+def _runs(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower())
+
+
+def tokenize(text: str) -> List[str]:
+    """索引分词：英文单词；中文单字 + 相邻两字"""
+    tokens = []
+    for run in _runs(text):
+        if _CJK_PATTERN.match(run):
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def query_terms(text: str) -> List[str]:
+    """查询分词：两个字以上的中文只用 bigram，去重"""
+    terms = []
+    for run in _runs(text):
+        if _CJK_PATTERN.match(run) and len(run) > 1:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.append(run)
+    return list(dict.fromkeys(terms))
+
+
+def _term_counts(text: str) -> dict:
+    counts = {}
+    for token in tokenize(text):
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+class SearchIndex:
+    """项目倒排索引"""
+
+    def __init__(self, log_path: Path, compact_min_records: int = 1000):
+        self.log_path = Path(log_path)
+        self.compact_min_records = compact_min_records
+        self._reset()
+        self._refresh()
+
+    @property
+    def exists(self) -> bool:
+        """索引日志是否存在（不存在时需要先 rebuild）"""
+        return self.log_path.exists()
+
+    def add_document(self, project: str, kind: str, doc_id: Optional[int], text: str):
+        """索引（或重新索引）一个文档"""
+        self._refresh()
+        key = (project, kind, doc_id)
+        terms = _term_counts(text)
+        self._append({"op": "add", "doc": list(key), "terms": terms})
+        self._add(key, terms)
+        self._maybe_compact()
+
+    def remove_project(self, project: str):
+        """删除一个项目的所有文档"""
+        self._refresh()
+        if project not in self._project_docs:
+            return
+        self._append({"op": "remove", "project": project})
+        self._remove_project(project)
+
+    def rebuild(self, projects: Iterable[dict]):
+        """按项目数据（Project.to_dict 格式）重建整个索引"""
+        self._reset()
+        for data in projects:
+            for key, text in iter_documents(data):
+                self._add(key, _term_counts(text))
+        self._compact()
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """
+        检索
+
+        Returns:
+            list: 按得分从高到低的命中 [{"project", "kind", "id", "score"}]，
+                  kind 为 project / milestone / discussion，id 为里程碑或讨论 ID
+        """
+        self._refresh()
+        terms = query_terms(query)
+        if not terms or not self._docs:
+            return []
+
+        postings = [self._term_postings(term) for term in terms]
+        if not all(postings):
+            return []
+
+        # 从最短的倒排表开始求交集
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        total_docs = len(self._docs)
+        norm = BM25_K1 / (self._total_len / total_docs)
+        weighted = [
+            (posting, math.log(1 + (total_docs - len(posting) + 0.5) / (len(posting) + 0.5)) * (BM25_K1 + 1))
+            for posting in postings
+        ]
+        doc_len = self._doc_len
+        scored = []
+        for key in candidates:
+            length_norm = BM25_K1 * (1 - BM25_B) + BM25_B * norm * doc_len[key]
+            score = 0.0
+            for posting, idf in weighted:
+                tf = posting[key]
+                score += idf * tf / (tf + length_norm)
+            scored.append((score * KIND_WEIGHTS.get(key[1], 1.0), key))
+
+        top = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], item[1][0], item[1][1], item[1][2] or 0))
+        return [
+            {"project": key[0], "kind": key[1], "id": key[2], "score": round(score, 4)}
+            for score, key in top
+        ]
+
+    def _term_postings(self, term: str) -> Optional[dict]:
+        """查询词的倒排表：中文精确匹配；英文/数字合并所有以它为前缀的词（词频相加）"""
+        if _CJK_PATTERN.match(term):
+            return self._postings.get(term)
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        start = bisect.bisect_left(self._sorted_terms, term)
+        end = bisect.bisect_left(self._sorted_terms, term + "\uffff", start)
+        matched = self._sorted_terms[start:end]
+        if len(matched) <= 1:
+            return self._postings.get(matched[0]) if matched else None
+        merged = {}
+        for word in matched:
+            for key, tf in self._postings[word].items():
+                merged[key] = merged.get(key, 0) + tf
+        return merged
+
+    def _reset(self):
+        self._docs = {}  # 文档 -> {词: 词频}
+        self._postings = {}  # 词 -> {文档: 词频}
+        self._sorted_terms = None  # 有序词表（前缀查询用），词表变化时置空、下次查询时重建
+        self._doc_len = {}
+        self._total_len = 0
+        self._project_docs = {}  # 项目名 -> 文档集合
+        self._log_records = 0
+        self._offset = 0  # 已读取的日志字节数
+        self._inode = None
+
+    def _add(self, key: DocKey, terms: dict):
+        if key in self._docs:
+            self._remove_doc(key)
+        self._docs[key] = terms
+        for term, tf in terms.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._sorted_terms = None
+            self._postings[term][key] = tf
+        length = sum(terms.values())
+        self._doc_len[key] = length
+        self._total_len += length
+        self._project_docs.setdefault(key[0], set()).add(key)
+
+    def _remove_doc(self, key: DocKey):
+        for term in self._docs.pop(key):
+            posting = self._postings[term]
+            del posting[key]
+            if not posting:
+                del self._postings[term]
+                self._sorted_terms = None
+        self._total_len -= self._doc_len.pop(key)
+
+    def _remove_project(self, project: str):
+        for key in self._project_docs.pop(project, ()):
+            self._remove_doc(key)
+
+    def _apply(self, record: dict):
+        if record.get("op") == "add":
+            project, kind, doc_id = record["doc"]
+            self._add((project, kind, doc_id), record["terms"])
+        elif record.get("op") == "remove":
+            self._remove_project(record["project"])
+
+    def _refresh(self):
+        """读取其他进程追加的日志记录；日志被压缩替换后重新完整加载"""
+        try:
+            stat = self.log_path.stat()
+        except FileNotFoundError:
+            if self._inode is not None:
+                self._reset()
+            return
+        if self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self._offset):
+            self._reset()
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        # 只处理完整的行，写了一半的最后一行留到下次读取
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError):
+                continue
+            self._log_records += 1
+        self._offset += end
+        self._inode = stat.st_ino
+
+    def _append(self, record: dict):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        with open(self.log_path, 'ab') as f:
+            start = f.seek(0, os.SEEK_END)
+            f.write(line)
+        self._log_records += 1
+        # 其他进程在此之前追加了记录时不移动读取位置，下次刷新时连同本条一起重放（重放是幂等的）
+        if start == self._offset:
+            self._offset += len(line)
+        self._inode = self.log_path.stat().st_ino
+
+    def _maybe_compact(self):
+        if self._log_records >= self.compact_min_records and self._log_records > 2 * len(self._docs):
+            self._compact()
+
+    def _compact(self):
+        """按内存中的索引重写日志（先写临时文件再替换）"""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.log_path.with_name(f"{self.log_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            for key, terms in self._docs.items():
+                f.write((json.dumps({"op": "add", "doc": list(key), "terms": terms}, ensure_ascii=False)
+                         + "\n").encode('utf-8'))
+        os.replace(tmp_path, self.log_path)
+        stat = self.log_path.stat()
+        self._log_records = len(self._docs)
+        self._offset = stat.st_size
+        self._inode = stat.st_ino
+
+
+def iter_documents(data: dict) -> Iterable[Tuple[DocKey, str]]:
+    """把一个项目拆成可检索的文档：项目本身、每个里程碑、每条讨论"""
+    name = data["name"]
+    yield (name, "project", None), f"{name} {data.get('description', '')}"
+    for m in data.get("milestones", []):
+        yield (name, "milestone", m["id"]), f"{m.get('title', '')} {m.get('description', '')}"
+    for d in data.get("discussions", []):
+        yield (name, "discussion", d["id"]), d.get("content", "")
@@ -9,6 +9,8 @@
     python project_tool.py add-milestone <项目名> <标题> [描述]  # 添加里程碑
     python project_tool.py discuss <项目名> <角色> <内容>        # 添加讨论
     python project_tool.py progress <项目名>        # 查看进度
+    python project_tool.py search <关键词>          # 全文搜索（名称、描述、里程碑、讨论）
+    python project_tool.py reindex                 # 重建搜索索引（手动编辑项目文件后使用）
 """
 
 import sys
@@ -16,7 +18,8 @@ import json
 from pathlib import Path
 from datetime import datetime
 from projects_manager import (
-    list_projects, get_project, create_project, delete_project
+    list_projects, get_project, create_project, delete_project,
+    search_projects, reindex_projects
 )
 
 def print_json(data):
@@ -147,6 +150,28 @@ def main():
         print(f"进度: {progress}%")
         print("[" + "█" * progress + "░" * (100 - progress) + "]")
     
+    elif command == "search":
+        if len(sys.argv) < 3:
+            print("用法: python project_tool.py search <关键词>")
+            return
+        keyword = " ".join(sys.argv[2:])
+        results = search_projects(keyword)
+        if not results:
+            print(f"\n🔍 没有找到与 '{keyword}' 相关的项目\n")
+            return
+        print(f"\n🔍 搜索: {keyword}")
+        print("="*60)
+        for p in results:
+            print(f"📋 {p['name']}  (得分 {p['score']})")
+            for m in p["matches"]:
+                label = {"project": "名称/描述", "milestone": "里程碑", "discussion": "讨论"}[m["kind"]]
+                print(f"   └ {label}" + (f" [{m['id']}]" if m["id"] is not None else ""))
+            print()
+    
+    elif command == "reindex":
+        count = reindex_projects()
+        print(f"✅ 已重建搜索索引，共 {count} 个项目")
+    
     else:
         print(f"未知命令: {command}")
         print(__doc__)
@@ -9,8 +9,19 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Optional
 
+from project_search import SearchIndex, iter_documents
+
 PROJECTS_DIR = Path(__file__).parent / "projects"
 
+# 项目摘要索引：文件名 -> 列表所需的摘要字段 + 项目文件的 mtime/大小
+# 不以 .json 结尾，不会被当成项目文件
+SUMMARY_INDEX_FILE = PROJECTS_DIR / ".summary_index"
+
+# 全文检索倒排索引日志（同样不以 .json 结尾）
+SEARCH_INDEX_FILE = PROJECTS_DIR / ".search_index.jsonl"
+
+_search_index = None
+
 class Project:
     """项目类"""
     
@@ -48,15 +59,19 @@ class Project:
         """保存项目"""
         PROJECTS_DIR.mkdir(exist_ok=True)
         filepath = PROJECTS_DIR / f"{self.name}.json"
+        data = self.to_dict()
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2)
         self.updated_at = datetime.now().isoformat()
+        _update_summary(filepath, data)
     
     def delete(self):
         """删除项目"""
         filepath = PROJECTS_DIR / f"{self.name}.json"
         if filepath.exists():
             filepath.unlink()
+        _update_summary(filepath, None)
+        _get_search_index().remove_project(self.name)
     
     def add_milestone(self, title: str, description: str = "", status: str = "pending"):
         """添加里程碑"""
@@ -69,6 +84,8 @@ class Project:
         }
         self.milestones.append(milestone)
         self.save()
+        _get_search_index().add_document(self.name, "milestone", milestone["id"],
+                                         f"{title} {description}")
         return milestone
     
     def add_discussion(self, role: str, content: str):
@@ -81,6 +98,7 @@ class Project:
         }
         self.discussions.append(discussion)
         self.save()
+        _get_search_index().add_document(self.name, "discussion", discussion["id"], content)
         return discussion
     
     def update_milestone_status(self, milestone_id: int, status: str):
@@ -94,21 +112,122 @@ class Project:
         return None
 
 
+def _summarize(data: dict) -> dict:
+    """项目列表显示的摘要"""
+    return {
+        "name": data["name"],
+        "description": data.get("description", "")[:50],
+        "status": data.get("status", "active"),
+        "milestones_count": len(data.get("milestones", [])),
+        "discussions_count": len(data.get("discussions", []))
+    }
+
+
+def _load_summary_index() -> dict:
+    """读取摘要索引，文件不存在或损坏时返回空索引（随后按项目文件重建）"""
+    try:
+        with open(SUMMARY_INDEX_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_summary_index(index: dict):
+    """写入摘要索引（先写临时文件再替换，其他进程不会读到写了一半的索引）"""
+    tmp_path = SUMMARY_INDEX_FILE.with_name(f"{SUMMARY_INDEX_FILE.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, SUMMARY_INDEX_FILE)
+
+
+def _update_summary(filepath: Path, data: Optional[dict]):
+    """项目保存或删除后更新对应的索引条目（data 为 None 表示删除）"""
+    index = _load_summary_index()
+    if data is None:
+        if index.pop(filepath.name, None) is None:
+            return
+    else:
+        stat = filepath.stat()
+        index[filepath.name] = {**_summarize(data), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    _save_summary_index(index)
+
+
+def _load_all_projects():
+    for filepath in sorted(PROJECTS_DIR.glob("*.json")):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            yield json.load(f)
+
+
+def _get_search_index() -> SearchIndex:
+    """全文检索索引（进程内只加载一次，索引日志不存在时按项目文件重建）"""
+    global _search_index
+    if _search_index is None or _search_index.log_path != SEARCH_INDEX_FILE:
+        PROJECTS_DIR.mkdir(exist_ok=True)
+        _search_index = SearchIndex(SEARCH_INDEX_FILE)
+        if not _search_index.exists:
+            _search_index.rebuild(_load_all_projects())
+    return _search_index
+
+
+def reindex_projects() -> int:
+    """按项目文件重建全文检索索引（项目文件被手动编辑后使用），返回项目数"""
+    projects = list(_load_all_projects())
+    _get_search_index().rebuild(projects)
+    return len(projects)
+
+
 def list_projects() -> List[dict]:
-    """列出所有项目"""
+    """
+    列出所有项目
+    
+    只读取摘要索引，并用目录中各项目文件的 mtime/大小校验：
+    只有索引缺失或过期（如被手动编辑、其他进程修改）的项目文件才重新解析。
+    """
     PROJECTS_DIR.mkdir(exist_ok=True)
-    projects = []
-    for f in PROJECTS_DIR.glob("*.json"):
-        with open(f, 'r', encoding='utf-8') as fp:
-            data = json.load(fp)
-            projects.append({
-                "name": data["name"],
-                "description": data.get("description", "")[:50],
-                "status": data.get("status", "active"),
-                "milestones_count": len(data.get("milestones", [])),
-                "discussions_count": len(data.get("discussions", []))
-            })
-    return projects
+    index = _load_summary_index()
+    changed = False
+    
+    files = {}
+    with os.scandir(PROJECTS_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                files[entry.name] = entry.stat()
+    
+    for filename in sorted(files):
+        stat = files[filename]
+        summary = index.get(filename)
+        if summary is None or summary["mtime_ns"] != stat.st_mtime_ns or summary["size"] != stat.st_size:
+            with open(PROJECTS_DIR / filename, 'r', encoding='utf-8') as fp:
+                data = json.load(fp)
+            index[filename] = {**_summarize(data), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+            changed = True
+    
+    # 去掉已被删除的项目文件
+    for filename in set(index) - set(files):
+        del index[filename]
+        changed = True
+    
+    if changed:
+        _save_summary_index(index)
+    
+    return [
+        {key: value for key, value in index[filename].items() if key not in ("mtime_ns", "size")}
+        for filename in sorted(files)
+    ]
+
+
+def _project_summary(index: dict, name: str) -> Optional[dict]:
+    """从摘要索引取单个项目的摘要（索引过期时重新解析该项目文件），项目不存在时返回 None"""
+    filepath = PROJECTS_DIR / f"{name}.json"
+    try:
+        stat = filepath.stat()
+    except FileNotFoundError:
+        return None
+    summary = index.get(filepath.name)
+    if summary is None or summary["mtime_ns"] != stat.st_mtime_ns or summary["size"] != stat.st_size:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return _summarize(json.load(f))
+    return {key: value for key, value in summary.items() if key not in ("mtime_ns", "size")}
 
 
 def get_project(name: str) -> Optional[Project]:
@@ -124,6 +243,11 @@ def create_project(name: str, description: str = "") -> Project:
     """创建项目"""
     project = Project(name, description)
     project.save()
+    # 同名项目被重新创建时先清掉旧的里程碑和讨论
+    index = _get_search_index()
+    index.remove_project(name)
+    for (_, kind, doc_id), text in iter_documents(project.to_dict()):
+        index.add_document(name, kind, doc_id, text)
     return project
 
 
@@ -136,10 +260,42 @@ def delete_project(name: str) -> bool:
     return False
 
 
-def search_projects(keyword: str) -> List[dict]:
-    """搜索项目"""
-    results = []
-    for p in list_projects():
-        if keyword.lower() in p["name"].lower() or keyword.lower() in p["description"].lower():
-            results.append(p)
-    return results
+def search_projects(keyword: str, limit: int = 20) -> List[dict]:
+    """
+    全文搜索项目（名称、描述、里程碑、讨论）
+    
+    英文和数字按单词前缀匹配；全文检索之外，名称或描述中包含关键词（子串，不区分大小写）的项目
+    也会列在后面（score 为 0，matches 为空），与旧版的子串搜索兼容。关键词为空时返回所有项目。
+    
+    Returns:
+        list: 按最高得分排序的项目摘要，每项附带 score 和 matches
+              （命中的 [{"kind", "id", "score"}]，kind 为 project / milestone / discussion）
+    """
+    if not keyword.strip():
+        return [{**p, "score": 0.0, "matches": []} for p in list_projects()]
+    
+    index = None
+    results = {}
+    for hit in _get_search_index().search(keyword, limit=limit * 10):
+        if hit["project"] not in results:
+            if len(results) >= limit:
+                continue
+            if index is None:
+                index = _load_summary_index()
+            summary = _project_summary(index, hit["project"])
+            if summary is None:
+                continue  # 项目文件已被外部删除
+            results[hit["project"]] = {**summary, "score": hit["score"], "matches": []}
+        results[hit["project"]]["matches"].append(
+            {"kind": hit["kind"], "id": hit["id"], "score": hit["score"]}
+        )
+    
+    # 名称或描述的子串匹配（如单词中间的片段）
+    lowered = keyword.lower()
+    if len(results) < limit:
+        for p in list_projects():
+            if len(results) >= limit:
+                break
+            if p["name"] not in results and (lowered in p["name"].lower() or lowered in p["description"].lower()):
+                results[p["name"]] = {**p, "score": 0.0, "matches": []}
+    return list(results.values())
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+功能需求存储 - 只追加日志 (JSONL) + 内存索引
+每次提交或状态变更只在日志末尾追加一行，不再读取并重写整个文件；
+启动时重放日志重建内存索引，被覆盖的旧记录累积到一定比例后自动压缩。
+
+查询走内存中按 (优先级, 提交时间) 维护的有序索引，并按状态分别维护一份，
+分页用游标定位 (bisect)，每次查询的开销只与页大小有关，不随历史记录数增长。
+
+多个 Web 工作进程共享同一份日志：写入时持有进程间文件锁 (.lock)，先读入其他进程追加的记录再追加；
+查询前比较日志的大小和 inode，有变化时补读新记录，日志被其他进程压缩替换后重新加载。
+
+日志记录格式:
+    {"op": "create", "request": {...完整需求...}}
+    {"op": "update", "id": "...", "changes": {...变更字段...}}
+"""
+
+import os
+import json
+import base64
+import bisect
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from file_lock import FileLock
+
+# 优先级排序（数字越小越靠前），未知优先级按 normal 处理
+PRIORITY_ORDER = {"high": 0, "normal": 1, "low": 2}
+
+
+class InvalidCursorError(ValueError):
+    """分页游标无效"""
+
+
+def _sort_key(request: dict) -> Tuple[int, str, str]:
+    return (PRIORITY_ORDER.get(request.get("priority"), 1), request.get("created_at", ""), request["id"])
+
+
+def encode_cursor(key: Tuple[int, str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii').rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, created_at, request_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(rank), str(created_at), str(request_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("无效的分页游标")
+
+
+def _fsync_dir(path: Path):
+    """同步目录项，保证 os.replace 之后的新文件名落盘（Windows 不支持，跳过）"""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class RequestStore:
+    """功能需求存储"""
+
+    def __init__(self, log_path: Path, legacy_path: Optional[Path] = None,
+                 compact_min_records: int = 1000, fsync: bool = True):
+        """
+        Args:
+            log_path: 日志文件路径 (.jsonl)
+            legacy_path: 旧版 requests.json，日志不存在时自动迁移
+            compact_min_records: 日志行数达到该值、且超过需求数 2 倍时自动压缩
+            fsync: 每次追加后是否 fsync（保证断电不丢已确认的提交）
+        """
+        self.log_path = Path(log_path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.compact_min_records = compact_min_records
+        self.fsync = fsync
+        self.requests = OrderedDict()  # id -> 需求（按提交顺序）
+        self._index = []  # 所有需求的排序键，有序
+        self._status_index = {}  # 状态 -> 该状态需求的排序键，有序
+        self._keys = {}  # id -> 当前排序键
+        self.version = 0  # 本进程看到的数据版本，每次变更加 1
+        self._log_records = 0  # 日志中的记录行数
+        # 已读入的日志位置：(inode, 字节偏移) 在所有进程中一致，用作 ETag（压缩后 inode 变化，客户端重新拉取一次）
+        self._inode = None
+        self._offset = 0
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(self.log_path.with_name(self.log_path.name + ".lock"))
+        self._file = None
+        with self._file_lock:
+            self._load()
+
+    def create(self, request: dict) -> dict:
+        """新增需求（request 须包含 id）"""
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if request["id"] in self.requests:
+                raise ValueError(f"需求 ID 已存在: {request['id']}")
+            self._append({"op": "create", "request": request})
+            self.requests[request["id"]] = dict(request)
+            self._index_add(self.requests[request["id"]])
+            self.version += 1
+            self._maybe_compact()
+            return self.requests[request["id"]]
+
+    def update(self, request_id: str, changes: dict) -> Optional[dict]:
+        """更新需求字段，需求不存在时返回 None"""
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if request_id not in self.requests:
+                return None
+            self._append({"op": "update", "id": request_id, "changes": changes})
+            self._index_remove(request_id)
+            self.requests[request_id].update(changes)
+            self._index_add(self.requests[request_id])
+            self.version += 1
+            self._maybe_compact()
+            return self.requests[request_id]
+
+    def get(self, request_id: str) -> Optional[dict]:
+        with self._lock:
+            self._sync()
+            return self.requests.get(request_id)
+
+    def all(self) -> List[dict]:
+        """所有需求（提交顺序）"""
+        with self._lock:
+            self._sync()
+            return list(self.requests.values())
+
+    def etag(self, *query) -> str:
+        """当前日志位置加查询参数对应的 ETag"""
+        digest = hashlib.sha1(json.dumps(query).encode('utf-8')).hexdigest()[:12]
+        with self._lock:
+            self._sync()
+            return f'"{self._inode or 0:x}-{self._offset}-{digest}"'
+
+    def query(self, status: Optional[str] = None, priority: Optional[str] = None,
+              limit: int = 100, cursor: Optional[str] = None) -> dict:
+        """
+        按 (优先级, 提交时间) 排序分页查询
+
+        Args:
+            status: 只返回该状态的需求
+            priority: 只返回该优先级的需求
+            limit: 每页条数
+            cursor: 上一页返回的 next_cursor
+
+        Returns:
+            dict: {"requests": 本页需求, "total": 符合条件的总数, "next_cursor": 下一页游标或 None}
+        """
+        with self._lock:
+            self._sync()
+            index = self._index if status is None else self._status_index.get(status, [])
+
+            # 优先级是排序键的第一项，同一优先级在索引中连续
+            lo, hi = 0, len(index)
+            if priority is not None:
+                rank = PRIORITY_ORDER.get(priority)
+                if rank is None:
+                    return {"requests": [], "total": 0, "next_cursor": None}
+                lo = bisect.bisect_left(index, (rank,))
+                hi = bisect.bisect_left(index, (rank + 1,))
+            total = hi - lo
+
+            start = lo
+            if cursor:
+                start = max(lo, bisect.bisect_right(index, decode_cursor(cursor)))
+            end = min(hi, start + limit)
+
+            page = [self.requests[key[2]] for key in index[start:end]]
+            next_cursor = encode_cursor(index[end - 1]) if end < hi and end > start else None
+            return {"requests": page, "total": total, "next_cursor": next_cursor}
+
+    def compact(self):
+        """把日志重写为每个需求一条 create 记录（先写临时文件再替换，崩溃时旧日志仍完整）"""
+        with self._lock, self._file_lock:
+            self._catch_up()
+            self._compact()
+
+    def close(self):
+        with self._lock:
+            self._close_file()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._sync()
+            return {"requests": len(self.requests), "log_records": self._log_records}
+
+    def _index_add(self, request: dict):
+        key = _sort_key(request)
+        self._keys[request["id"]] = key
+        bisect.insort(self._index, key)
+        bisect.insort(self._status_index.setdefault(request.get("status"), []), key)
+
+    def _index_remove(self, request_id: str):
+        key = self._keys.pop(request_id)
+        del self._index[bisect.bisect_left(self._index, key)]
+        status_keys = self._status_index[self.requests[request_id].get("status")]
+        del status_keys[bisect.bisect_left(status_keys, key)]
+
+    def _load(self):
+        """从头重放日志重建内存状态（持有文件锁时调用）"""
+        self._close_file()
+        self.requests = OrderedDict()
+        self._log_records = 0
+        self._inode = None
+        self._offset = 0
+        self.version += 1
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.log_path.exists():
+            self._rebuild_index()
+            self._migrate_legacy()
+            return
+
+        with open(self.log_path, 'rb') as f:
+            self._inode = os.fstat(f.fileno()).st_ino
+            needs_compact = self._replay(f)
+
+        self._rebuild_index()
+        if needs_compact:
+            self._compact()
+
+    def _sync(self):
+        """日志被其他进程修改过时补读（无变化时只需一次 stat，不加文件锁）"""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino == self._inode and stat.st_size == self._offset:
+            return
+        with self._file_lock:
+            self._catch_up()
+
+    def _catch_up(self):
+        """读入其他进程追加的记录；日志被替换（压缩）或截短时重新加载（持有文件锁时调用）"""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._load()
+            return
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.log_path, 'rb') as f:
+            needs_compact = self._replay(f, incremental=True)
+        self.version += 1
+        if needs_compact:
+            self._compact()
+
+    def _replay(self, f, incremental: bool = False) -> bool:
+        """
+        从已读位置重放日志记录
+
+        Args:
+            f: 以二进制方式打开的日志文件
+            incremental: 逐条更新排序索引（否则由调用方重放后一次性重建）
+
+        Returns:
+            bool: 是否遇到损坏的记录（需要压缩日志丢弃）
+        """
+        needs_compact = False
+        f.seek(self._offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                # 崩溃时可能留下写了一半的最后一行，压缩时丢弃
+                return True
+            self._offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                needs_compact = True
+                continue
+            request_id = (record.get("request") or {}).get("id") if record.get("op") == "create" else record.get("id")
+            if incremental and request_id in self._keys:
+                self._index_remove(request_id)
+            self._apply(record)
+            if incremental and request_id in self.requests:
+                self._index_add(self.requests[request_id])
+            self._log_records += 1
+        return needs_compact
+
+    def _rebuild_index(self):
+        """重放日志后一次性排序建立索引"""
+        self._keys = {request_id: _sort_key(request) for request_id, request in self.requests.items()}
+        self._index = sorted(self._keys.values())
+        self._status_index = {}
+        for request_id, key in self._keys.items():
+            self._status_index.setdefault(self.requests[request_id].get("status"), []).append(key)
+        for keys in self._status_index.values():
+            keys.sort()
+
+    def _apply(self, record: dict):
+        if record.get("op") == "create":
+            request = record["request"]
+            self.requests[request["id"]] = request
+        elif record.get("op") == "update" and record.get("id") in self.requests:
+            self.requests[record["id"]].update(record["changes"])
+
+    def _migrate_legacy(self):
+        """从旧版整体 JSON 文件迁移，迁移后旧文件改名为 .bak"""
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return
+        with open(self.legacy_path, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+        for request in legacy:
+            self.requests[request["id"]] = request
+        self._rebuild_index()
+        self._compact()
+        self.legacy_path.replace(self.legacy_path.with_suffix(self.legacy_path.suffix + ".bak"))
+
+    def _append(self, record: dict):
+        if self._file is None:
+            self._file = open(self.log_path, 'ab')
+            self._inode = os.fstat(self._file.fileno()).st_ino
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        self._file.write(line)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._offset += len(line)
+        self._log_records += 1
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _maybe_compact(self):
+        if self._log_records >= self.compact_min_records and self._log_records > 2 * len(self.requests):
+            self._compact()
+
+    def _compact(self):
+        self._close_file()
+
+        tmp_path = self.log_path.with_suffix(self.log_path.suffix + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            for request in self.requests.values():
+                f.write((json.dumps({"op": "create", "request": request}, ensure_ascii=False) + "\n").encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+            self._inode = os.fstat(f.fileno()).st_ino
+            self._offset = f.tell()
+        os.replace(tmp_path, self.log_path)
+        _fsync_dir(self.log_path.parent)
+        self._log_records = len(self.requests)
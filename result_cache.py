@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+转换结果缓存
+以 (输入 SHA-256, 转换类型, 转换器版本/选项) 作为键保存转换结果，重复上传同一文件时直接返回缓存。
+缓存文件按最近使用时间 (LRU) 淘汰，总大小不超过配置的字节预算。
+缓存索引保存在缓存目录下的 SQLite 数据库 (index.db) 中，多个 Web 工作进程共享同一份索引和预算。
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from state_db import StateDB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at);
+"""
+
+
+def link_or_copy(source: Path, dest: Path):
+    """
+    优先创建硬链接（不占额外空间），跨文件系统等情况下退回复制
+
+    新文件的修改时间设为当前时间：输出目录的后台清理按修改时间计算保留期，
+    否则由旧缓存条目生成的输出会沿用原转换时间，刚生成就被当作过期文件删除。
+    （硬链接与源文件共用 inode，源文件的修改时间也随之更新；缓存按索引中的使用时间淘汰，不受影响。）
+    """
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+    os.utime(dest)
+
+
+class ResultCache:
+    """基于内容哈希的转换结果缓存"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.db = None
+        # 命中、未命中、淘汰次数为本进程的统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.db = StateDB(self.cache_dir / "index.db", SCHEMA)
+            self._migrate_legacy()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(sha256: str, convert_type: str, version: str, options: Optional[dict] = None) -> str:
+        """生成缓存键"""
+        raw = json.dumps([sha256, convert_type, version, options or {}], sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """查询缓存，命中时返回缓存条目 {"path", "size", "result"} 并更新使用时间"""
+        if not self.enabled:
+            return None
+        rows = self.db.execute("SELECT file, size, result FROM entries WHERE key = ?", (key,))
+        entry = None
+        if rows:
+            entry = {"path": self.cache_dir / rows[0]["file"], "size": rows[0]["size"],
+                     "result": json.loads(rows[0]["result"])}
+        if entry is None or not entry["path"].exists():
+            if entry is not None:
+                with self.db.transaction() as conn:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+        self.db.execute("UPDATE entries SET used_at = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return entry
+
+    def contains(self, key: str) -> bool:
+        """是否有该缓存条目（不更新使用时间和命中统计）"""
+        return self.enabled and bool(self.db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)))
+
+    def put(self, key: str, output_path: Path, result: dict):
+        """把转换结果加入缓存（持有写锁时检查并写入，多个进程同时写入同一结果只保留一份）"""
+        if not self.enabled:
+            return
+        size = output_path.stat().st_size
+        if size > self.max_bytes:
+            return
+
+        cache_path = self.cache_dir / f"{key}{output_path.suffix}"
+        with self.db.transaction() as conn:
+            if conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone():
+                return
+            cache_path.unlink(missing_ok=True)  # 进程崩溃遗留的未登记文件
+            link_or_copy(output_path, cache_path)
+            conn.execute(
+                "INSERT INTO entries (key, file, size, result, used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, cache_path.name, size, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+            self._evict(conn)
+
+    def stats(self) -> dict:
+        """缓存统计"""
+        entries, total_bytes = 0, 0
+        if self.enabled:
+            entries, total_bytes = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries")[0]
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _migrate_legacy(self):
+        """迁移旧版每个条目一个 .json 元数据文件的缓存（按文件修改时间恢复 LRU 顺序），迁移后删除元数据文件"""
+        meta_paths = list(self.cache_dir.glob("*.json"))
+        if not meta_paths:
+            return
+        with self.db.transaction() as conn:
+            for meta_path in meta_paths:
+                try:
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                    stat = (self.cache_dir / meta["file"]).stat()
+                except (OSError, ValueError, KeyError):
+                    meta_path.unlink(missing_ok=True)
+                    continue
+                conn.execute(
+                    "INSERT OR IGNORE INTO entries (key, file, size, result, used_at) VALUES (?, ?, ?, ?, ?)",
+                    (meta_path.stem, meta["file"], stat.st_size,
+                     json.dumps(meta.get("result", {}), ensure_ascii=False), stat.st_mtime),
+                )
+                meta_path.unlink()
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """总大小超过预算时从最久未使用的条目开始删除（在写事务中调用）"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, file, size in conn.execute("SELECT key, file, size FROM entries ORDER BY used_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            (self.cache_dir / file).unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
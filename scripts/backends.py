@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+文本提取后端
+- pdfplumber：完整的版面分析，能识别表格，但速度较慢
+- pypdf2：只提取文本，不做版面分析，纯文本页面快得多
+- auto：逐页嗅探，简单的纯文本页面走 PyPDF2，有线条/表格或字体编码复杂的页面仍交给 pdfplumber
+
+pdfplumber 默认按线条识别表格，页面内容流中没有画线/矩形操作时不会识别出表格，
+所以这类页面用 PyPDF2 提取文本不会丢失表格。
+"""
+
+import re
+from typing import Iterator, Optional
+
+import pdfplumber
+from PyPDF2 import PdfReader
+
+from scripts.page_analysis import analyze_page
+from scripts.timing import StageTimer
+
+BACKENDS = ("auto", "pdfplumber", "pypdf2")
+
+# 内容流中的画线 (l) 和矩形 (re) 操作，前面是数字操作数
+_RULE_PATTERN = re.compile(rb"[\d.]\s+(?:re|l)(?=[\s\[\]/(<]|$)")
+
+# 内容流中的文本绘制操作
+_TEXT_PATTERN = re.compile(rb"(?:Tj|TJ|'|\")(?=[\s\[\]/(<]|$)")
+
+# PyPDF2 能正确解码的 CID 字体编码（需同时提供 ToUnicode）
+_SIMPLE_CID_ENCODINGS = ("/Identity-H", "/Identity-V")
+
+
+def _page_content(page) -> bytes:
+    """读取 PyPDF2 页面的内容流"""
+    contents = page.get_contents()
+    return contents.get_data() if contents is not None else b""
+
+
+def _has_simple_fonts(page) -> bool:
+    """页面字体是否都能被 PyPDF2 正确解码（无 Type3，CID 字体为 Identity 编码且带 ToUnicode）"""
+    resources = page.get("/Resources")
+    if resources is None:
+        return True
+    resources = resources.get_object()
+
+    fonts = resources.get("/Font")
+    if fonts is not None:
+        for font in fonts.get_object().values():
+            font = font.get_object()
+            subtype = font.get("/Subtype")
+            if subtype == "/Type3":
+                return False
+            if subtype == "/Type0":
+                if font.get("/Encoding") not in _SIMPLE_CID_ENCODINGS or "/ToUnicode" not in font:
+                    return False
+
+    # 表单 XObject 中可能还有文本和线条，统一交给 pdfplumber
+    xobjects = resources.get("/XObject")
+    if xobjects is not None:
+        for xobject in xobjects.get_object().values():
+            if xobject.get_object().get("/Subtype") == "/Form":
+                return False
+    return True
+
+
+def is_simple_page(page) -> bool:
+    """
+    嗅探页面是否适合只提取文本
+
+    Args:
+        page: PyPDF2 页面对象
+    """
+    if not _has_simple_fonts(page):
+        return False
+    return _RULE_PATTERN.search(_page_content(page)) is None
+
+
+def _looks_garbled(text: str, page) -> bool:
+    """PyPDF2 提取结果是否不可信（含空字符/替换字符，或页面有文字却提取为空）"""
+    if "\x00" in text or "\ufffd" in text:
+        return True
+    return not text.strip() and _TEXT_PATTERN.search(_page_content(page)) is not None
+
+
+class PageSource:
+    """
+    按所选后端逐页提取 PDF 内容
+
+    用法:
+        with PageSource(input_path, backend="auto") as source:
+            for analysis in source.pages():
+                ...
+
+    每页返回 {"text": 原始文本（可能为 None）, "tables": 表格数据列表, "backend": 实际使用的后端}
+
+    pdfplumber 会在页面对象上缓存解析结果，不释放的话内存随页数线性增长；
+    streaming 为 True 时每页分析完立即释放，峰值内存与总页数无关。
+
+    各阶段耗时 (open / sniff / extract_text / extract_tables) 累计到 timer 中。
+    """
+
+    def __init__(self, input_path: str, backend: str = "auto", streaming: bool = True,
+                 timer: Optional[StageTimer] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"不支持的提取后端: {backend}")
+        self.input_path = input_path
+        self.backend = backend
+        self.streaming = streaming
+        self.timer = timer or StageTimer()
+        self._reader: Optional[PdfReader] = None
+        self._plumber = None
+
+    def __enter__(self):
+        with self.timer.stage("open"):
+            if self.backend == "pdfplumber":
+                self._plumber = pdfplumber.open(self.input_path)
+                self._plumber.pages  # 解析页面树，计入打开耗时
+            else:
+                self._reader = PdfReader(self.input_path)
+                self._reader.pages
+        return self
+
+    def __exit__(self, *exc):
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+        self._reader = None
+
+    @property
+    def total_pages(self) -> int:
+        if self._reader is not None:
+            return len(self._reader.pages)
+        return len(self._plumber.pages)
+
+    def pages(self, start: int = 0, end: Optional[int] = None) -> Iterator[dict]:
+        """逐页提取第 start 到 end 页（从 0 开始、左闭右开）"""
+        if end is None:
+            end = self.total_pages
+        for index in range(start, end):
+            if self.backend == "pdfplumber":
+                yield self._plumber_page(index)
+                continue
+
+            page = self._reader.pages[index]
+            if self.backend == "auto":
+                with self.timer.stage("sniff"):
+                    simple = is_simple_page(page)
+                if not simple:
+                    yield self._plumber_page(index)
+                    continue
+
+            try:
+                with self.timer.stage("extract_text"):
+                    text = page.extract_text()
+            except Exception:
+                if self.backend == "pypdf2":
+                    raise
+                text = None
+            if self.backend == "auto" and (text is None or _looks_garbled(text, page)):
+                yield self._plumber_page(index)
+            else:
+                yield {"text": text, "tables": [], "backend": "pypdf2"}
+
+    def _plumber_page(self, index: int) -> dict:
+        """用 pdfplumber 分析单页（auto 模式下首次需要时才打开）"""
+        if self._plumber is None:
+            with self.timer.stage("open"):
+                self._plumber = pdfplumber.open(self.input_path)
+                self._plumber.pages
+        page = self._plumber.pages[index]
+        analysis = analyze_page(page, self.timer)
+        if self.streaming:
+            page.close()
+        analysis["backend"] = "pdfplumber"
+        return analysis
+
+
+def summarize_backends(counts: dict) -> str:
+    """按各后端处理的页数给出整体使用的后端名称（两种都用到时为 mixed）"""
+    used = [name for name, pages in counts.items() if pages]
+    if len(used) == 1:
+        return used[0]
+    return "mixed" if used else "none"
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+批量转换
+多进程并行转换目录中的 PDF，并在输出目录中维护完成清单 (manifest)：
+记录每个已完成输入的路径、大小、修改时间和哈希，重新运行时跳过未变化的文件，
+中途崩溃后可以从断点继续。每个文件的结果在完成时立即写入报告，而不是等全部结束。
+
+用法:
+    python -m scripts.batch <word|ppt> <输入目录> <输出目录> [--workers N] [--no-resume]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+MANIFEST_NAME = ".convert_manifest.jsonl"
+REPORT_NAME = "convert_report.jsonl"
+
+
+def file_sha256(path: Path) -> str:
+    """分块计算文件 SHA-256"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path: Path) -> dict:
+    """读取完成清单，返回 文件名 -> 记录（后写入的记录覆盖先前的）"""
+    records = {}
+    if not manifest_path.exists():
+        return records
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 崩溃时可能留下不完整的最后一行
+            records[record["file"]] = record
+    return records
+
+
+def _compact_manifest(manifest_path: Path, records: dict):
+    """重写清单，去掉被覆盖的旧记录（先写临时文件再替换，避免中途崩溃损坏清单）"""
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records.values():
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, manifest_path)
+
+
+def _is_unchanged(pdf_file: Path, record: dict, output_dir: Path) -> bool:
+    """输入未变化且输出仍在时返回 True；大小一致但修改时间变了才计算哈希"""
+    if record is None or not (output_dir / record["output"]).exists():
+        return False
+    stat = pdf_file.stat()
+    if stat.st_size != record["size"]:
+        return False
+    if stat.st_mtime == record["mtime"]:
+        return True
+    return file_sha256(pdf_file) == record["sha256"]
+
+
+def _convert_one(converter: Callable, pdf_file: str, output_file: str) -> dict:
+    """转换单个文件并计算输入指纹（在工作进程中运行）"""
+    stat = os.stat(pdf_file)
+    started = time.perf_counter()
+    result = converter(pdf_file, output_file)
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    result["size"] = stat.st_size
+    result["mtime"] = stat.st_mtime
+    result["sha256"] = file_sha256(Path(pdf_file))
+    return result
+
+
+def _append_line(f, data: dict):
+    f.write(json.dumps(data, ensure_ascii=False) + "\n")
+    f.flush()
+
+
+def run_batch(converter: Callable, input_dir: str, output_dir: str, suffix: str,
+              workers: int = 1, resume: bool = True) -> list:
+    """
+    批量转换目录中的 PDF 文件
+
+    Args:
+        converter: 转换函数 converter(input_path, output_path) -> dict（需为模块顶层函数）
+        input_dir: 输入文件夹路径
+        output_dir: 输出文件夹路径
+        suffix: 输出文件扩展名（如 .docx）
+        workers: 并行进程数
+        resume: 是否跳过清单中已完成且未变化的文件
+
+    Returns:
+        list: 每个文件的转换结果列表
+    """
+    input_path = Path(input_dir)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    manifest_path = output_path / MANIFEST_NAME
+    manifest = load_manifest(manifest_path) if resume else {}
+    if manifest:
+        _compact_manifest(manifest_path, manifest)
+
+    results = []
+    pending = []
+    for pdf_file in sorted(input_path.glob("*.pdf")):
+        if resume and _is_unchanged(pdf_file, manifest.get(pdf_file.name), output_path):
+            results.append({
+                "success": True,
+                "skipped": True,
+                "file": pdf_file.name,
+                "message": "未变化，已跳过"
+            })
+        else:
+            pending.append(pdf_file)
+
+    started = time.perf_counter()
+    with open(manifest_path, 'a', encoding='utf-8') as manifest_f, \
+            open(output_path / REPORT_NAME, 'w', encoding='utf-8') as report_f:
+        for skipped in results:
+            _append_line(report_f, skipped)
+
+        def record(pdf_file: Path, result: dict):
+            result["file"] = pdf_file.name
+            results.append(result)
+            _append_line(report_f, result)
+            if result.get("success"):
+                _append_line(manifest_f, {
+                    "file": pdf_file.name,
+                    "size": result["size"],
+                    "mtime": result["mtime"],
+                    "sha256": result["sha256"],
+                    "output": f"{pdf_file.stem}{suffix}",
+                    "finished_at": datetime.now().isoformat()
+                })
+
+        def output_for(pdf_file: Path) -> str:
+            return str(output_path / f"{pdf_file.stem}{suffix}")
+
+        if workers <= 1:
+            for pdf_file in pending:
+                record(pdf_file, _convert_one(converter, str(pdf_file), output_for(pdf_file)))
+        else:
+            # 限制同时提交的任务数，文件数很多时也不会一次性堆积全部 future
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as executor:
+                queue = iter(pending)
+                in_flight = {}
+                for pdf_file in queue:
+                    in_flight[executor.submit(_convert_one, converter, str(pdf_file), output_for(pdf_file))] = pdf_file
+                    if len(in_flight) >= workers * 4:
+                        break
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pdf_file = in_flight.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = {"success": False, "pages": 0, "message": f"转换失败: {str(e)}"}
+                        record(pdf_file, result)
+                        next_file = next(queue, None)
+                        if next_file is not None:
+                            in_flight[executor.submit(
+                                _convert_one, converter, str(next_file), output_for(next_file)
+                            )] = next_file
+
+        _append_line(report_f, {"summary": {
+            "total": len(results),
+            "converted": sum(1 for r in results if r.get("success") and not r.get("skipped")),
+            "skipped": sum(1 for r in results if r.get("skipped")),
+            "failed": sum(1 for r in results if not r.get("success")),
+            "seconds": round(time.perf_counter() - started, 3)
+        }})
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量转换 PDF 文件")
+    parser.add_argument("type", choices=["word", "ppt"], help="转换类型")
+    parser.add_argument("input_dir", help="输入文件夹")
+    parser.add_argument("output_dir", help="输出文件夹")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行进程数")
+    parser.add_argument("--no-resume", action="store_true", help="忽略完成清单，全部重新转换")
+    args = parser.parse_args()
+
+    if args.type == "word":
+        from scripts.pdf_handler import convert_batch
+    else:
+        from scripts.pdf_to_ppt import convert_batch
+
+    results = convert_batch(args.input_dir, args.output_dir, workers=args.workers, resume=not args.no_resume)
+    failed = [r for r in results if not r.get("success")]
+    print(f"完成: {len(results) - len(failed)} / {len(results)}，失败: {len(failed)}")
+    for r in failed:
+        print(f"  ❌ {r['file']}: {r['message']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+快速 DOCX 写入器
+python-docx 每添加一个段落、每设置一个单元格都要创建和修改多个 XML 对象，文本多的文档大部分时间花在这里。
+这里直接拼接 WordprocessingML 片段，保存时把 word/document.xml 流式写入 zip，
+其余部件（样式、主题、设置等）取自 python-docx 默认模板，每个进程只加载一次。
+
+生成的 XML 与 python-docx 对同样的 add_heading / add_paragraph / add_table / add_page_break 调用生成的一致。
+"""
+
+import io
+import re
+import zipfile
+from typing import BinaryIO, List, Optional, Sequence, Union
+from xml.sax.saxutils import escape
+
+from docx import Document
+
+# XML 1.0 不允许的控制字符（python-docx 遇到会报错，这里直接去掉）
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_RUN_SPECIAL = re.compile(r"(\t|\r|\n)")
+
+_DOCUMENT_PART = "word/document.xml"
+_EMUS_PER_TWIP = 635
+
+# 写入 document.xml 时每积累多少个片段写一次
+_FLUSH_PARTS = 4096
+
+_template = None
+
+
+class _Template:
+    """默认模板：除 document.xml 以外的部件，以及 document.xml 中正文前后的固定部分"""
+
+    def __init__(self):
+        doc = Document()
+        section = doc.sections[-1]
+        # 表格列宽按正文宽度平均分配（与 python-docx 的 add_table 一致）
+        self.block_width = section.page_width - section.left_margin - section.right_margin
+
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        self.parts = []  # [(ZipInfo, 内容)]，保持原有顺序
+        with zipfile.ZipFile(buffer) as zf:
+            for info in zf.infolist():
+                data = zf.read(info)
+                if info.filename == _DOCUMENT_PART:
+                    xml = data.decode("utf-8")
+                    body_start = xml.index("<w:body>") + len("<w:body>")
+                    sect_start = xml.index("<w:sectPr", body_start)
+                    self.document_head = xml[:body_start].encode("utf-8")
+                    self.document_tail = xml[sect_start:].encode("utf-8")
+                self.parts.append((info, data))
+
+
+def _copy_info(info: zipfile.ZipInfo) -> zipfile.ZipInfo:
+    """ZipFile 写入时会修改 ZipInfo，每次保存使用副本，模板可被多个线程共用"""
+    copy = zipfile.ZipInfo(info.filename, info.date_time)
+    copy.compress_type = zipfile.ZIP_DEFLATED
+    copy.external_attr = info.external_attr
+    return copy
+
+
+def load_template() -> _Template:
+    """加载（并缓存）默认模板，可在工作进程启动时调用以预热"""
+    global _template
+    if _template is None:
+        _template = _Template()
+    return _template
+
+
+def _clean(text: str) -> str:
+    return _INVALID_XML_CHARS.sub("", text)
+
+
+def _t(text: str) -> str:
+    if len(text.strip()) < len(text):
+        return f'<w:t xml:space="preserve">{escape(text)}</w:t>'
+    return f"<w:t>{escape(text)}</w:t>"
+
+
+def _run(text: str) -> str:
+    """一个 w:r：制表符转 w:tab，换行转 w:br（与 python-docx 的 run.text 一致）"""
+    if not text:
+        return "<w:r/>"
+    if "\t" not in text and "\n" not in text and "\r" not in text:
+        return f"<w:r>{_t(text)}</w:r>"
+    content = []
+    for piece in _RUN_SPECIAL.split(text):
+        if piece == "\t":
+            content.append("<w:tab/>")
+        elif piece in ("\r", "\n"):
+            content.append("<w:br/>")
+        elif piece:
+            content.append(_t(piece))
+    return f"<w:r>{''.join(content)}</w:r>"
+
+
+class DocxWriter:
+    """按顺序追加段落、标题、表格和分页符，最后一次性打包成 .docx"""
+
+    def __init__(self):
+        self._template = load_template()
+        self._parts: List[str] = []
+
+    def add_heading(self, text: str = "", level: int = 1, align: Optional[str] = None):
+        """添加标题（level 0 为文档标题样式 Title）；align 为 w:jc 取值，如 center"""
+        style = "Title" if level == 0 else f"Heading{level}"
+        jc = f'<w:jc w:val="{align}"/>' if align else ""
+        run = _run(_clean(text)) if text else ""
+        self._parts.append(f'<w:p><w:pPr><w:pStyle w:val="{style}"/>{jc}</w:pPr>{run}</w:p>')
+
+    def add_paragraph(self, text: str = ""):
+        """添加正文段落"""
+        if text:
+            self._parts.append(f"<w:p>{_run(_clean(text))}</w:p>")
+        else:
+            self._parts.append("<w:p/>")
+
+    def add_page_break(self):
+        self._parts.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+
+    def add_table(self, rows: Sequence[Sequence[str]], style: str = "TableGrid"):
+        """
+        添加表格（一次生成所有行），列数取第一行的列数
+
+        Args:
+            rows: 每行的单元格文本
+            style: 表格样式 ID（Table Grid 对应 TableGrid）
+        """
+        cols = len(rows[0]) if rows else 0
+        col_width = self._template.block_width // cols if cols else 0
+        twips = int(round(col_width / _EMUS_PER_TWIP))
+        tc_pr = f'<w:tcPr><w:tcW w:type="dxa" w:w="{twips}"/></w:tcPr>'
+
+        parts = [
+            f'<w:tbl><w:tblPr><w:tblStyle w:val="{style}"/><w:tblW w:type="auto" w:w="0"/>'
+            '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+            'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>',
+            f'<w:gridCol w:w="{twips}"/>' * cols,
+            "</w:tblGrid>",
+        ]
+        for row in rows:
+            cells = [f"<w:tc>{tc_pr}<w:p>{_run(_clean(str(text)))}</w:p></w:tc>" for text in row[:cols]]
+            # 列数不足的行补空单元格
+            cells.extend(f"<w:tc>{tc_pr}<w:p/></w:tc>" for _ in range(cols - len(cells)))
+            parts.append(f"<w:tr>{''.join(cells)}</w:tr>")
+        parts.append("</w:tbl>")
+        self._parts.append("".join(parts))
+
+    def save(self, output: Union[str, BinaryIO]):
+        """打包保存到文件路径或可写的二进制文件对象"""
+        template = self._template
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+            for info, data in template.parts:
+                if info.filename != _DOCUMENT_PART:
+                    zf.writestr(_copy_info(info), data)
+                    continue
+                with zf.open(_copy_info(info), "w") as f:
+                    f.write(template.document_head)
+                    for start in range(0, len(self._parts), _FLUSH_PARTS):
+                        f.write("".join(self._parts[start:start + _FLUSH_PARTS]).encode("utf-8"))
+                    f.write(template.document_tail)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+页面分析
+每页只做一次表格检测：先找出表格区域并提取表格内容，再只对表格区域以外的字符提取文本。
+这样表格文字不会再被当作普通段落重复输出，文本提取也不再处理表格内的字符。
+Word 和 PPT 转换器共用这一步的结果。
+"""
+
+from typing import Optional
+
+from scripts.timing import StageTimer
+
+
+def _inside(obj: dict, bboxes: list) -> bool:
+    """字符中心点是否落在任一表格区域内"""
+    x = (obj["x0"] + obj["x1"]) / 2
+    y = (obj["top"] + obj["bottom"]) / 2
+    for x0, top, x1, bottom in bboxes:
+        if x0 <= x <= x1 and top <= y <= bottom:
+            return True
+    return False
+
+
+def analyze_page(page, timer: Optional[StageTimer] = None) -> dict:
+    """
+    分析单页内容
+
+    Args:
+        page: pdfplumber 页面对象
+        timer: 阶段耗时统计（extract_tables / extract_text）
+
+    Returns:
+        dict: {"text": 表格区域以外的原始文本（可能为 None）, "tables": 表格数据列表}
+    """
+    timer = timer or StageTimer()
+
+    with timer.stage("extract_tables"):
+        tables = page.find_tables()
+        table_data = [table.extract() for table in tables]
+
+    with timer.stage("extract_text"):
+        if tables:
+            bboxes = [table.bbox for table in tables]
+            text_page = page.filter(
+                lambda obj: obj.get("object_type") != "char" or not _inside(obj, bboxes)
+            )
+        else:
+            text_page = page
+        text = text_page.extract_text()
+
+    return {
+        "text": text,
+        "tables": table_data
+    }
+
@@ -1,94 +1,79 @@
 #!/usr/bin/env python3
 """
 PDF 转 Word 转换器
-使用 pdfplumber 和 python-docx 实现 PDF 到 DOCX 的转换
+使用 pdfplumber / PyPDF2 提取内容，默认用 scripts/docx_writer.py 直接生成 DOCX（也可选 python-docx）
 """
 
 from pathlib import Path
-import pdfplumber
 from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 import re
 
+from scripts.batch import run_batch
+from scripts.backends import PageSource, summarize_backends
+from scripts.page_parallel import should_parallelize, iter_pages_parallel
+from scripts.timing import StageTimer
+from scripts.docx_writer import DocxWriter
 
-def pdf_to_word(input_path: str, output_path: str) -> dict:
+# 文档构建方式：fast 直接拼接 XML（默认）/ python-docx 逐个创建对象（输出相同，较慢）
+WRITERS = ("fast", "python-docx")
+
+
+def pdf_to_word(input_path: str, output_path: str, page_workers: int = 1, streaming: bool = True,
+                backend: str = "auto", writer: str = "fast") -> dict:
     """
     将 PDF 文件转换为 Word 文档
     
     Args:
         input_path: PDF 文件路径
         output_path: 输出 Word 文件路径
+        page_workers: 按页并行提取的进程数（大文件时生效，1 表示顺序处理）
+        streaming: 流式处理，每页处理完立即释放 pdfplumber 缓存，内存占用不随页数增长
+        backend: 文本提取后端 (auto / pdfplumber / pypdf2)，auto 按页自动选择
+        writer: 文档构建方式 (fast / python-docx)
     
     Returns:
-        dict: 转换结果信息
+        dict: 转换结果信息（timings 为各阶段耗时，单位秒）
     """
     result = {
         "success": False,
         "pages": 0,
         "message": ""
     }
+    timer = StageTimer()
     
     try:
-        # 创建 Word 文档
-        doc = Document()
-        
-        # 添加标题
-        title = doc.add_heading(Path(input_path).stem, 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        with timer.stage("build"):
+            # 创建 Word 文档并添加标题
+            doc = new_document(Path(input_path).stem, writer)
         
         # 打开 PDF
-        with pdfplumber.open(input_path) as pdf:
-            result["pages"] = len(pdf.pages)
+        with PageSource(input_path, backend, streaming, timer) as source:
+            total_pages = source.total_pages
+            result["pages"] = total_pages
+            
+            if should_parallelize(total_pages, page_workers):
+                # 多进程提取，按页码顺序组装（等待工作进程的时间计入 extract）
+                page_iter = timer.timed_iter(
+                    "extract",
+                    iter_pages_parallel(_extract_range, input_path, total_pages, page_workers, backend)
+                )
+            else:
+                page_iter = (extract_page(analysis) for analysis in source.pages())
             
-            for page_num, page in enumerate(pdf.pages, 1):
-                # 添加页面标题
-                doc.add_heading(f"第 {page_num} 页", level=1)
-                
-                # 提取文本
-                text = page.extract_text()
-                
-                if text:
-                    # 清理文本
-                    text = clean_text(text)
-                    
-                    # 按段落分割并添加
-                    paragraphs = text.split('\n')
-                    for para in paragraphs:
-                        para = para.strip()
-                        if para:
-                            # 检查是否是标题（短行+无句末标点）
-                            if len(para) < 50 and not para.endswith(('。', '！', '？', ')', ']')):
-                                heading = doc.add_heading(para, level=2)
-                            else:
-                                p = doc.add_paragraph(para)
-                
-                # 提取表格（如果有）
-                tables = page.extract_tables()
-                if tables:
-                    doc.add_heading("表格", level=3)
-                    for table in tables:
-                        table_doc = doc.add_table(rows=1, cols=len(table[0]) if table else 0)
-                        table_doc.style = 'Table Grid'
-                        
-                        # 添加表头
-                        header_cells = table_doc.rows[0].cells
-                        for i, cell in enumerate(table[0]):
-                            header_cells[i].text = str(cell) if cell else ""
-                        
-                        # 添加数据行
-                        for row in table[1:]:
-                            row_cells = table_doc.rows[-1].cells
-                            for i, cell in enumerate(row):
-                                if i < len(row_cells):
-                                    row_cells[i].text = str(cell) if cell else ""
-                
-                # 添加页面分隔
-                if page_num < len(pdf.pages):
-                    doc.add_page_break()
+            backend_pages = {"pdfplumber": 0, "pypdf2": 0}
+            for page_num, page_data in enumerate(page_iter, 1):
+                backend_pages[page_data["backend"]] += 1
+                with timer.stage("build"):
+                    add_page(doc, page_num, total_pages, page_data)
+            
+            result["backend"] = summarize_backends(backend_pages)
+            result["backend_pages"] = backend_pages
         
         # 保存文档
-        doc.save(output_path)
+        with timer.stage("save"):
+            doc.save(output_path)
         
         result["success"] = True
         result["message"] = f"转换成功！共 {result['pages']} 页"
@@ -96,9 +81,98 @@ def pdf_to_word(input_path: str, output_path: str) -> dict:
     except Exception as e:
         result["message"] = f"转换失败: {str(e)}"
     
+    result["timings"] = timer.as_dict()
+    
     return result
 
 
+def extract_page(analysis: dict) -> dict:
+    """
+    整理单页提取结果，得到可跨进程传递的中间结果
+    
+    Args:
+        analysis: PageSource 返回的单页提取结果
+    
+    Returns:
+        dict: {"text": 清理后的文本, "tables": 表格数据列表, "backend": 使用的提取后端}
+    """
+    text = analysis["text"]
+    return {
+        "text": clean_text(text) if text else "",
+        "tables": analysis["tables"],
+        "backend": analysis["backend"]
+    }
+
+
+def _extract_range(input_path: str, start: int, end: int, backend: str = "auto") -> list:
+    """提取第 start 到 end 页（从 0 开始、左闭右开），供并行提取的工作进程调用"""
+    with PageSource(input_path, backend) as source:
+        return [extract_page(analysis) for analysis in source.pages(start, end)]
+
+
+def new_document(title: str, writer: str = "fast"):
+    """创建带居中标题的文档（DocxWriter 或 python-docx Document）"""
+    if writer not in WRITERS:
+        raise ValueError(f"不支持的文档构建方式: {writer}")
+    if writer == "python-docx":
+        doc = Document()
+        heading = doc.add_heading(title, 0)
+        heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    else:
+        doc = DocxWriter()
+        doc.add_heading(title, 0, align="center")
+    return doc
+
+
+def add_page(doc, page_num: int, total_pages: int, page_data: dict):
+    """把一页的提取结果写入 Word 文档"""
+    # 添加页面标题
+    doc.add_heading(f"第 {page_num} 页", level=1)
+    
+    text = page_data["text"]
+    if text:
+        # 按段落分割并添加
+        paragraphs = text.split('\n')
+        for para in paragraphs:
+            para = para.strip()
+            if para:
+                # 检查是否是标题（短行+无句末标点）
+                if len(para) < 50 and not para.endswith(('。', '！', '？', ')', ']')):
+                    heading = doc.add_heading(para, level=2)
+                else:
+                    p = doc.add_paragraph(para)
+    
+    # 添加表格（如果有）
+    tables = page_data["tables"]
+    if tables:
+        doc.add_heading("表格", level=3)
+        for table in tables:
+            if table:
+                add_table(doc, table_rows(table))
+    
+    # 添加页面分隔
+    if page_num < total_pages:
+        doc.add_page_break()
+
+
+def table_rows(table: list) -> list:
+    """提取的表格转为要写入的单元格文本（空单元格为空串）"""
+    return [[str(cell) if cell else "" for cell in row] for row in table]
+
+
+def add_table(doc, rows: list):
+    """添加网格样式的表格，列数取第一行的列数（DocxWriter 一次生成所有行）"""
+    if isinstance(doc, DocxWriter):
+        doc.add_table(rows, style="TableGrid")
+        return
+    table_doc = doc.add_table(rows=len(rows), cols=len(rows[0]))
+    table_doc.style = 'Table Grid'
+    for row, row_doc in zip(rows, table_doc.rows):
+        row_cells = row_doc.cells
+        for i, text in enumerate(row[:len(row_cells)]):
+            row_cells[i].text = text
+
+
 def clean_text(text: str) -> str:
     """清理提取的文本"""
     # 移除多余的空白字符
@@ -108,30 +182,20 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
-def convert_batch(input_dir: str, output_dir: str) -> list:
+def convert_batch(input_dir: str, output_dir: str, workers: int = 1, resume: bool = True) -> list:
     """
     批量转换 PDF 文件
     
     Args:
         input_dir: 输入文件夹路径
         output_dir: 输出文件夹路径
+        workers: 并行进程数
+        resume: 跳过完成清单中已转换且未变化的文件（断点续转）
     
     Returns:
         list: 每个文件的转换结果列表
     """
-    input_path = Path(input_dir)
-    output_path = Path(output_dir)
-    
-    results = []
-    pdf_files = list(input_path.glob("*.pdf"))
-    
-    for pdf_file in pdf_files:
-        output_file = output_path / f"{pdf_file.stem}.docx"
-        result = pdf_to_word(str(pdf_file), str(output_file))
-        result["file"] = pdf_file.name
-        results.append(result)
-    
-    return results
+    return run_batch(pdf_to_word, input_dir, output_dir, ".docx", workers=workers, resume=resume)
 
 
 if __name__ == "__main__":
@@ -145,4 +209,4 @@ if __name__ == "__main__":
         result = pdf_to_word(input_file, output_file)
         print(result)
     else:
-        print("用法: python pdf_handler.py <input.pdf> [output.docx]")
+        print("用法: python -m scripts.pdf_handler <input.pdf> [output.docx]")
@@ -1,170 +1,96 @@
 #!/usr/bin/env python3
 """
 PDF 转 PowerPoint 转换器
-使用 pdfplumber 和 python-pptx 实现 PDF 到 PPTX 的转换
+使用 pdfplumber / PyPDF2 提取内容，默认用 scripts/pptx_writer.py 直接生成幻灯片 XML（也可选 python-pptx）
 """
 
-from pathlib import Path
-import pdfplumber
-from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 import re
 
+from scripts.batch import run_batch
+from scripts.backends import PageSource, summarize_backends
+from scripts.page_parallel import should_parallelize, iter_pages_parallel
+from scripts.timing import StageTimer
+from scripts.pptx_writer import ParagraphStyle, PptxWriter, PresentationWriter
 
-def pdf_to_ppt(input_path: str, output_path: str) -> dict:
+# 演示文稿构建方式：fast 直接拼接 XML（默认）/ python-pptx 逐个创建对象（输出相同，较慢）
+WRITERS = {
+    "fast": PptxWriter,
+    "python-pptx": PresentationWriter,
+}
+
+# 段落样式（每种样式的 XML 只生成一次，所有幻灯片共用）
+PAGE_TITLE_STYLE = ParagraphStyle(size=Pt(14), color=RGBColor(100, 100, 100), align=PP_ALIGN.CENTER)
+TITLE_STYLE = ParagraphStyle(size=Pt(24), bold=True, color=RGBColor(0, 51, 102), space_before=Pt(12))
+HEADING_STYLE = ParagraphStyle(size=Pt(18), bold=True, color=RGBColor(0, 102, 204), space_before=Pt(18))
+BODY_STYLE = ParagraphStyle(size=Pt(16), color=RGBColor(0, 0, 0), space_before=Pt(6))
+TABLE_TITLE_STYLE = ParagraphStyle(size=Pt(12), color=RGBColor(100, 100, 100))
+TABLE_HEADER_STYLE = ParagraphStyle(size=Pt(12), bold=True)
+TABLE_CELL_STYLE = ParagraphStyle(size=Pt(10))
+
+# 每张幻灯片最多放的表格行数（含表头）和列数，更大的表格分到多张幻灯片
+TABLE_ROWS_PER_SLIDE = 20
+TABLE_COLS_PER_SLIDE = 10
+
+
+def pdf_to_ppt(input_path: str, output_path: str, page_workers: int = 1, streaming: bool = True,
+               backend: str = "auto", writer: str = "fast") -> dict:
     """
     将 PDF 文件转换为 PowerPoint 演示文稿
     
     Args:
         input_path: PDF 文件路径
         output_path: 输出 PPT 文件路径
+        page_workers: 按页并行提取的进程数（大文件时生效，1 表示顺序处理）
+        streaming: 流式处理，每页处理完立即释放 pdfplumber 缓存，内存占用不随页数增长
+        backend: 文本提取后端 (auto / pdfplumber / pypdf2)，auto 按页自动选择
+        writer: 演示文稿构建方式 (fast / python-pptx)
     
     Returns:
-        dict: 转换结果信息
+        dict: 转换结果信息（timings 为各阶段耗时，单位秒）
     """
     result = {
         "success": False,
         "pages": 0,
         "message": ""
     }
+    timer = StageTimer()
     
     try:
-        # 创建 PowerPoint 演示文稿
-        prs = Presentation()
+        with timer.stage("build"):
+            # 创建 PowerPoint 演示文稿
+            if writer not in WRITERS:
+                raise ValueError(f"不支持的演示文稿构建方式: {writer}")
+            prs = WRITERS[writer]()
         
         # 打开 PDF
-        with pdfplumber.open(input_path) as pdf:
-            result["pages"] = len(pdf.pages)
+        with PageSource(input_path, backend, streaming, timer) as source:
+            total_pages = source.total_pages
+            result["pages"] = total_pages
             
-            for page_num, page in enumerate(pdf.pages, 1):
-                # 创建一个新幻灯片（空白布局）
-                slide_layout = prs.slide_layouts[6]  # 空白布局
-                slide = prs.slides.add_slide(slide_layout)
-                
-                # 添加页面标题
-                title_box = slide.shapes.add_textbox(
-                    Inches(0.5), Inches(0.3), Inches(9), Inches(0.8)
+            if should_parallelize(total_pages, page_workers):
+                # 多进程提取，按页码顺序组装（等待工作进程的时间计入 extract）
+                page_iter = timer.timed_iter(
+                    "extract",
+                    iter_pages_parallel(_extract_range, input_path, total_pages, page_workers, backend)
                 )
-                title_frame = title_box.text_frame
-                title_frame.text = f"第 {page_num} 页 / 共 {len(pdf.pages)} 页"
-                title_para = title_frame.paragraphs[0]
-                title_para.font.size = Pt(14)
-                title_para.font.color.rgb = RGBColor(100, 100, 100)
-                title_para.alignment = PP_ALIGN.CENTER
-                
-                # 提取文本
-                text = page.extract_text()
-                
-                if text:
-                    # 清理文本
-                    text = clean_text(text)
-                    
-                    # 创建文本框
-                    text_box = slide.shapes.add_textbox(
-                        Inches(0.5), Inches(1.0), Inches(9), Inches(5)
-                    )
-                    text_frame = text_box.text_frame
-                    text_frame.word_wrap = True
-                    
-                    # 按段落分割
-                    paragraphs = text.split('\n')
-                    
-                    for i, para in enumerate(paragraphs):
-                        para = para.strip()
-                        if not para:
-                            continue
-                        
-                        # 处理标题（短行）
-                        if len(para) < 50 and not para.endswith(('。', '！', '？', ')', ']', '.')):
-                            if i == 0:
-                                # 第一段作为大标题
-                                p = text_frame.paragraphs[0]
-                                p.text = para
-                                p.font.size = Pt(24)
-                                p.font.bold = True
-                                p.font.color.rgb = RGBColor(0, 51, 102)
-                                p.space_before = Pt(12)
-                            else:
-                                # 添加新段落作为小标题
-                                p = text_frame.add_paragraph()
-                                p.text = para
-                                p.font.size = Pt(18)
-                                p.font.bold = True
-                                p.font.color.rgb = RGBColor(0, 102, 204)
-                                p.space_before = Pt(18)
-                        else:
-                            # 普通段落
-                            if i == 0 and text_frame.paragraphs[0].text == "":
-                                p = text_frame.paragraphs[0]
-                            else:
-                                p = text_frame.add_paragraph()
-                            p.text = para
-                            p.font.size = Pt(16)
-                            p.font.color.rgb = RGBColor(0, 0, 0)
-                            p.space_before = Pt(6)
-                
-                # 提取表格（如果有）
-                tables = page.extract_tables()
-                if tables:
-                    # 添加表格标题
-                    table_title = slide.shapes.add_textbox(
-                        Inches(0.5), Inches(0.3), Inches(9), Inches(0.5)
-                    )
-                    tt_frame = table_title.text_frame
-                    tt_frame.text = f"表格数据"
-                    tt_frame.paragraphs[0].font.size = Pt(12)
-                    tt_frame.paragraphs[0].font.color.rgb = RGBColor(100, 100, 100)
-                    
-                    for table_idx, table in enumerate(tables):
-                        if not table or not table[0]:
-                            continue
-                        
-                        # 计算表格尺寸
-                        rows = len(table)
-                        cols = len(table[0])
-                        
-                        # 限制行列数（防止过大）
-                        if rows > 50 or cols > 10:
-                            continue
-                        
-                        # 添加表格
-                        left = Inches(0.5)
-                        top = Inches(5.5) + Inches(table_idx * 0.5)
-                        width = Inches(9)
-                        height = Inches(0.8)
-                        
-                        # 检查是否超出页面
-                        if top + Inches(rows * 0.5) > Inches(7):
-                            # 新建幻灯片
-                            slide_layout = prs.slide_layouts[6]
-                            slide = prs.slides.add_slide(slide_layout)
-                            top = Inches(0.5)
-                        
-                        table_shape = slide.shapes.add_table(
-                            rows, cols, left, top, width, height
-                        )
-                        table = table_shape.table
-                        
-                        # 设置列宽
-                        for col_idx in range(cols):
-                            table.columns[col_idx].width = Inches(9 / cols)
-                        
-                        # 填充数据
-                        for row_idx, row in enumerate(table):
-                            for col_idx, cell in enumerate(row):
-                                if cell:
-                                    cell.text = str(cell)
-                                    # 第一行加粗（表头）
-                                    if row_idx == 0:
-                                        cell.text_frame.paragraphs[0].font.bold = True
-                                        cell.text_frame.paragraphs[0].font.size = Pt(12)
-                                    else:
-                                        cell.text_frame.paragraphs[0].font.size = Pt(10)
+            else:
+                page_iter = (extract_page(analysis) for analysis in source.pages())
+            
+            backend_pages = {"pdfplumber": 0, "pypdf2": 0}
+            for page_num, page_data in enumerate(page_iter, 1):
+                backend_pages[page_data["backend"]] += 1
+                with timer.stage("build"):
+                    add_slide(prs, page_num, total_pages, page_data)
+            
+            result["backend"] = summarize_backends(backend_pages)
+            result["backend_pages"] = backend_pages
         
         # 保存演示文稿
-        prs.save(output_path)
+        with timer.stage("save"):
+            prs.save(output_path)
         
         result["success"] = True
         result["message"] = f"转换成功！共 {result['pages']} 页"
@@ -174,9 +100,128 @@ def pdf_to_ppt(input_path: str, output_path: str) -> dict:
         import traceback
         traceback.print_exc()
     
+    result["timings"] = timer.as_dict()
+    
     return result
 
 
+def extract_page(analysis: dict) -> dict:
+    """
+    整理单页提取结果，得到可跨进程传递的中间结果
+    
+    Args:
+        analysis: PageSource 返回的单页提取结果
+    
+    Returns:
+        dict: {"text": 清理后的文本, "tables": 表格数据列表, "backend": 使用的提取后端}
+    """
+    text = analysis["text"]
+    return {
+        "text": clean_text(text) if text else "",
+        "tables": analysis["tables"],
+        "backend": analysis["backend"]
+    }
+
+
+def _extract_range(input_path: str, start: int, end: int, backend: str = "auto") -> list:
+    """提取第 start 到 end 页（从 0 开始、左闭右开），供并行提取的工作进程调用"""
+    with PageSource(input_path, backend) as source:
+        return [extract_page(analysis) for analysis in source.pages(start, end)]
+
+
+def add_slide(prs, page_num: int, total_pages: int, page_data: dict):
+    """把一页的提取结果写成幻灯片（prs 为 PptxWriter 或 PresentationWriter）"""
+    # 创建一个新幻灯片（空白布局）
+    slide = prs.add_slide()
+    
+    # 添加页面标题
+    slide.add_textbox(
+        Inches(0.5), Inches(0.3), Inches(9), Inches(0.8),
+        [(f"第 {page_num} 页 / 共 {total_pages} 页", PAGE_TITLE_STYLE)]
+    )
+    
+    text = page_data["text"]
+    if text:
+        # 文本框自带一个空段落，第一段写入其中
+        paragraphs = [("", None)]
+        
+        # 按段落分割
+        for i, para in enumerate(text.split('\n')):
+            para = para.strip()
+            if not para:
+                continue
+            
+            # 处理标题（短行）：第一段作为大标题，其余作为小标题
+            if len(para) < 50 and not para.endswith(('。', '！', '？', ')', ']', '.')):
+                style = TITLE_STYLE if i == 0 else HEADING_STYLE
+            else:
+                # 普通段落
+                style = BODY_STYLE
+            
+            if i == 0:
+                paragraphs[0] = (para, style)
+            else:
+                paragraphs.append((para, style))
+        
+        slide.add_textbox(Inches(0.5), Inches(1.0), Inches(9), Inches(5), paragraphs, word_wrap=True)
+    
+    # 添加表格（如果有）
+    tables = page_data["tables"]
+    if tables:
+        # 添加表格标题
+        slide.add_textbox(
+            Inches(0.5), Inches(0.3), Inches(9), Inches(0.5),
+            [("表格数据", TABLE_TITLE_STYLE)]
+        )
+        
+        for table_idx, table in enumerate(tables):
+            if not table or not table[0]:
+                continue
+            
+            for chunk_idx, chunk in enumerate(table_chunks(table)):
+                # 计算表格尺寸
+                rows = len(chunk)
+                cols = len(chunk[0])
+                
+                # 添加表格
+                left = Inches(0.5)
+                top = Inches(5.5) + Inches(table_idx * 0.5)
+                width = Inches(9)
+                height = Inches(0.8)
+                
+                # 超出页面时新建幻灯片；分页后的每一块各占一张幻灯片
+                if chunk_idx > 0 or top + Inches(rows * 0.5) > Inches(7):
+                    slide = prs.add_slide()
+                    top = Inches(0.5)
+                
+                # 第一行为表头（加粗）
+                cells = [
+                    [(str(cell), TABLE_HEADER_STYLE if row_idx == 0 else TABLE_CELL_STYLE) if cell else None
+                     for cell in row[:cols]]
+                    for row_idx, row in enumerate(chunk)
+                ]
+                slide.add_table(rows, cols, left, top, width, height, cells, col_width=Inches(9 / cols))
+
+
+def table_chunks(table: list, rows_per_slide: int = TABLE_ROWS_PER_SLIDE,
+                 cols_per_slide: int = TABLE_COLS_PER_SLIDE):
+    """
+    把表格切成每张幻灯片放得下的分块
+    
+    列数超过 cols_per_slide 时先按列分组，每组再按行分页；每一块都以（对应列的）表头行开头。
+    
+    Yields:
+        list: 分块的行（第一行为表头）
+    """
+    header, body = table[0], table[1:]
+    body_rows = rows_per_slide - 1
+    for col_start in range(0, len(header), cols_per_slide):
+        col_end = col_start + cols_per_slide
+        for row_start in range(0, max(len(body), 1), body_rows):
+            rows = body[row_start:row_start + body_rows]
+            yield [header[col_start:col_end]] + [row[col_start:col_end] for row in rows]
+
+
 def clean_text(text: str) -> str:
     """清理提取的文本"""
     # 移除多余的空白字符
@@ -188,30 +233,20 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
-def convert_batch(input_dir: str, output_dir: str) -> list:
+def convert_batch(input_dir: str, output_dir: str, workers: int = 1, resume: bool = True) -> list:
     """
     批量转换 PDF 文件
     
     Args:
         input_dir: 输入文件夹路径
         output_dir: 输出文件夹路径
+        workers: 并行进程数
+        resume: 跳过完成清单中已转换且未变化的文件（断点续转）
     
     Returns:
         list: 每个文件的转换结果列表
     """
-    input_path = Path(input_dir)
-    output_path = Path(output_dir)
-    
-    results = []
-    pdf_files = list(input_path.glob("*.pdf"))
-    
-    for pdf_file in pdf_files:
-        output_file = output_path / f"{pdf_file.stem}.pptx"
-        result = pdf_to_ppt(str(pdf_file), str(output_file))
-        result["file"] = pdf_file.name
-        results.append(result)
-    
-    return results
+    return run_batch(pdf_to_ppt, input_dir, output_dir, ".pptx", workers=workers, resume=resume)
 
 
 if __name__ == "__main__":
@@ -225,4 +260,4 @@ if __name__ == "__main__":
         result = pdf_to_ppt(input_file, output_file)
         print(result)
     else:
-        print("用法: python pdf_to_ppt.py <input.pdf> [output.pptx]")
+        print("用法: python -m scripts.pdf_to_ppt <input.pdf> [output.pptx]")
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+快速 PPTX 写入器
+python-pptx 每设置一次字号、加粗、颜色或段前距都要查找并修改 XML 节点，逐段、逐个单元格设置时大部分时间花在这里。
+这里每种段落样式的 a:pPr 只生成一次，所有段落共用；幻灯片直接拼接成 XML 写入 zip。
+母版、版式、主题等部件取自 python-pptx 默认模板，每个进程只加载一次。
+
+生成的幻灯片与用 python-pptx 做同样的 add_textbox / add_table 操作得到的 XML 一致；
+PresentationWriter 是同样接口的 python-pptx 实现，用于对照。
+"""
+
+import io
+import re
+import zipfile
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
+from xml.sax.saxutils import escape
+
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN
+from pptx.util import Length
+
+_NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+_NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_REL_SLIDE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+_REL_LAYOUT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout"
+_CT_SLIDE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+_URI_TABLE = "http://schemas.openxmlformats.org/drawingml/2006/table"
+_TABLE_STYLE = "{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}"  # python-pptx 默认表格样式
+
+_XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+_SLIDE_HEAD = (
+    f'{_XML_DECLARATION}<p:sld xmlns:a="{_NS_A}" xmlns:p="{_NS_P}" xmlns:r="{_NS_R}"><p:cSld><p:spTree>'
+    '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+)
+_SLIDE_TAIL = "</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>"
+
+# 空白版式（python-pptx 默认模板中的第 7 个版式）
+BLANK_LAYOUT = 6
+
+# python-pptx 会把除制表符、换行外的控制字符写成 _xHHHH_ 形式
+_CTRL_CHARS = re.compile(r"[\x00-\x08\x0b-\x1f]")
+_INVALID_XML_CHARS = re.compile("[\ufffe\uffff]")
+_LINE_BREAKS = re.compile("\n|\v")
+
+_template = None
+
+Paragraph = Tuple[str, Optional["ParagraphStyle"]]  # (文本, 样式)
+
+
+class ParagraphStyle:
+    """段落样式（对应 python-pptx 的 paragraph.font、alignment、space_before），a:pPr 只生成一次"""
+
+    def __init__(self, size: Optional[Length] = None, bold: bool = False, color: Optional[RGBColor] = None,
+                 align: Optional[PP_ALIGN] = None, space_before: Optional[Length] = None):
+        self.size = size
+        self.bold = bold
+        self.color = color
+        self.align = align
+        self.space_before = space_before
+
+        algn = f' algn="{align.xml_value}"' if align is not None else ""
+        spacing = f'<a:spcBef><a:spcPts val="{space_before.centipoints}"/></a:spcBef>' if space_before else ""
+        attrs = (f' sz="{size.centipoints}"' if size else "") + (' b="1"' if bold else "")
+        if color is not None:
+            def_rpr = f'<a:defRPr{attrs}><a:solidFill><a:srgbClr val="{color}"/></a:solidFill></a:defRPr>'
+        elif attrs:
+            def_rpr = f"<a:defRPr{attrs}/>"
+        else:
+            def_rpr = ""
+        self.xml = f"<a:pPr{algn}>{spacing}{def_rpr}</a:pPr>"
+
+    def apply(self, paragraph):
+        """把样式设置到 python-pptx 段落上"""
+        if self.size:
+            paragraph.font.size = self.size
+        if self.bold:
+            paragraph.font.bold = True
+        if self.color is not None:
+            paragraph.font.color.rgb = self.color
+        if self.space_before:
+            paragraph.space_before = self.space_before
+        if self.align is not None:
+            paragraph.alignment = self.align
+
+
+class _Template:
+    """默认模板的各个部件，以及添加幻灯片时需要修改的几个部件的拆分位置"""
+
+    def __init__(self):
+        prs = Presentation()
+        layout = prs.slide_layouts[BLANK_LAYOUT].part.partname
+        self.layout_target = "../" + layout.lstrip("/").split("/", 1)[1]
+
+        buffer = io.BytesIO()
+        prs.save(buffer)
+        self.parts = []  # [(文件名, 内容)]，保持原有顺序
+        with zipfile.ZipFile(buffer) as zf:
+            for info in zf.infolist():
+                self.parts.append((info.filename, zf.read(info)))
+        parts = dict(self.parts)
+
+        presentation = parts["ppt/presentation.xml"].decode("utf-8")
+        split = presentation.index("<p:sldSz")
+        self.presentation = (presentation[:split], presentation[split:])
+
+        rels = parts["ppt/_rels/presentation.xml.rels"].decode("utf-8")
+        split = rels.rindex("</Relationships>")
+        self.presentation_rels = (rels[:split], rels[split:])
+        self.first_rid = max(int(n) for n in re.findall(r'Id="rId(\d+)"', rels)) + 1
+
+        # [Content_Types].xml 中的 Override 按部件名排序，添加幻灯片后保持这个顺序
+        types = parts["[Content_Types].xml"].decode("utf-8")
+        first = types.index("<Override ")
+        last = types.rindex("</Types>")
+        self.content_types_head = types[:first]
+        names = re.findall(r'<Override PartName="([^"]+)"[^>]*/>', types[first:last])
+        self.override_xml = dict(zip(names, re.findall(r"<Override [^>]*/>", types[first:last])))
+
+
+def load_template() -> _Template:
+    """加载（并缓存）默认模板，可在工作进程启动时调用以预热"""
+    global _template
+    if _template is None:
+        _template = _Template()
+    return _template
+
+
+def _text(text: str) -> str:
+    text = _INVALID_XML_CHARS.sub("", text)
+    return escape(_CTRL_CHARS.sub(lambda m: "_x%04X_" % ord(m.group()), text))
+
+
+def _paragraph(text: str, style: Optional[ParagraphStyle]) -> str:
+    """一个 a:p（与 python-pptx 的 paragraph.text 一致：换行和垂直制表符转 a:br，空串不生成 a:r）"""
+    content = []
+    for i, piece in enumerate(_LINE_BREAKS.split(text)):
+        if i:
+            content.append("<a:br/>")
+        if piece:
+            content.append(f"<a:r><a:t>{_text(piece)}</a:t></a:r>")
+    ppr = style.xml if style is not None else ""
+    if not ppr and not content:
+        return "<a:p/>"
+    return f"<a:p>{ppr}{''.join(content)}</a:p>"
+
+
+def _frame_paragraphs(text: str, style: Optional[ParagraphStyle]) -> str:
+    """整个文本框的内容（与 python-pptx 的 text_frame.text 一致：按换行分段，样式只用于第一段）"""
+    lines = text.split("\n")
+    return _paragraph(lines[0], style) + "".join(_paragraph(line, None) for line in lines[1:])
+
+
+class SlideXml:
+    """一张幻灯片：按顺序添加文本框和表格"""
+
+    def __init__(self):
+        self._shapes: List[str] = []
+        self._next_id = 2
+
+    def add_textbox(self, left: int, top: int, width: int, height: int, paragraphs: Sequence[Paragraph],
+                    word_wrap: bool = False):
+        """
+        添加文本框
+
+        Args:
+            paragraphs: 段落 [(文本, 样式)]，样式为 None 的段落使用默认格式
+            word_wrap: 自动换行
+        """
+        shape_id = self._take_id()
+        body = "".join(_paragraph(text, style) for text, style in paragraphs) or "<a:p/>"
+        self._shapes.append(
+            f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="TextBox {shape_id - 1}"/><p:cNvSpPr txBox="1"/>'
+            f'<p:nvPr/></p:nvSpPr><p:spPr><a:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{width}" cy="{height}"/>'
+            '</a:xfrm><a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr><p:txBody>'
+            f'<a:bodyPr wrap="{"square" if word_wrap else "none"}"><a:spAutoFit/></a:bodyPr><a:lstStyle/>'
+            f"{body}</p:txBody></p:sp>"
+        )
+
+    def add_table(self, rows: int, cols: int, left: int, top: int, width: int, height: int,
+                  cells: Sequence[Sequence[Optional[Paragraph]]], col_width: Optional[int] = None):
+        """
+        添加表格
+
+        Args:
+            cells: 每行每个单元格的 (文本, 样式)，None 表示空单元格；文本中的换行分成多个段落，样式只用于第一段
+            col_width: 统一的列宽；不指定时按 width 平均分配
+        """
+        shape_id = self._take_id()
+        if col_width is None:
+            widths = [width // cols] * (cols - 1) + [width - (cols - 1) * (width // cols)]
+        else:
+            widths = [col_width] * cols
+        heights = [height // rows] * (rows - 1) + [height - (rows - 1) * (height // rows)]
+
+        parts = [
+            f'<p:graphicFrame><p:nvGraphicFramePr><p:cNvPr id="{shape_id}" name="Table {shape_id - 1}"/>'
+            '<p:cNvGraphicFramePr><a:graphicFrameLocks noGrp="1"/></p:cNvGraphicFramePr><p:nvPr/>'
+            f'</p:nvGraphicFramePr><p:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{sum(widths)}" cy="{height}"/>'
+            f'</p:xfrm><a:graphic><a:graphicData uri="{_URI_TABLE}"><a:tbl>'
+            f'<a:tblPr firstRow="1" bandRow="1"><a:tableStyleId>{_TABLE_STYLE}</a:tableStyleId></a:tblPr><a:tblGrid>',
+            "".join(f'<a:gridCol w="{w}"/>' for w in widths),
+            "</a:tblGrid>",
+        ]
+        empty_cell = "<a:tc><a:txBody><a:bodyPr/><a:lstStyle/><a:p/></a:txBody><a:tcPr/></a:tc>"
+        for row_idx, row_height in enumerate(heights):
+            row = cells[row_idx] if row_idx < len(cells) else ()
+            parts.append(f'<a:tr h="{row_height}">')
+            for col_idx in range(cols):
+                cell = row[col_idx] if col_idx < len(row) else None
+                if cell is None:
+                    parts.append(empty_cell)
+                else:
+                    parts.append(f"<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>{_frame_paragraphs(*cell)}"
+                                 "</a:txBody><a:tcPr/></a:tc>")
+            parts.append("</a:tr>")
+        parts.append("</a:tbl></a:graphicData></a:graphic></p:graphicFrame>")
+        self._shapes.append("".join(parts))
+
+    def to_xml(self) -> bytes:
+        return (_SLIDE_HEAD + "".join(self._shapes) + _SLIDE_TAIL).encode("utf-8")
+
+    def _take_id(self) -> int:
+        shape_id = self._next_id
+        self._next_id += 1
+        return shape_id
+
+
+class PptxWriter:
+    """按顺序添加空白版式的幻灯片，最后一次性打包成 .pptx"""
+
+    def __init__(self):
+        self._template = load_template()
+        self._slides: List[Union[SlideXml, bytes]] = []
+
+    def add_slide(self) -> SlideXml:
+        # 开始新幻灯片时把上一张序列化，不保留片段列表
+        if self._slides and isinstance(self._slides[-1], SlideXml):
+            self._slides[-1] = self._slides[-1].to_xml()
+        slide = SlideXml()
+        self._slides.append(slide)
+        return slide
+
+    def save(self, output: Union[str, BinaryIO]):
+        """打包保存到文件路径或可写的二进制文件对象"""
+        template = self._template
+        count = len(self._slides)
+        rids = range(template.first_rid, template.first_rid + count)
+        replaced = {}
+        if count:
+            head, tail = template.presentation
+            slide_ids = "".join(f'<p:sldId id="{256 + i}" r:id="rId{rid}"/>' for i, rid in enumerate(rids))
+            replaced["ppt/presentation.xml"] = f"{head}<p:sldIdLst>{slide_ids}</p:sldIdLst>{tail}"
+
+            head, tail = template.presentation_rels
+            rels = "".join(f'<Relationship Id="rId{rid}" Type="{_REL_SLIDE}" Target="slides/slide{i}.xml"/>'
+                           for i, rid in enumerate(rids, 1))
+            replaced["ppt/_rels/presentation.xml.rels"] = head + rels + tail
+
+            overrides = dict(template.override_xml)
+            for i in range(1, count + 1):
+                name = f"/ppt/slides/slide{i}.xml"
+                overrides[name] = f'<Override PartName="{name}" ContentType="{_CT_SLIDE}"/>'
+            replaced["[Content_Types].xml"] = (
+                template.content_types_head + "".join(overrides[name] for name in sorted(overrides)) + "</Types>"
+            )
+
+        slide_rels = (
+            f'{_XML_DECLARATION}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{_REL_LAYOUT}" Target="{template.layout_target}"/></Relationships>'
+        ).encode("utf-8")
+
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in template.parts:
+                zf.writestr(name, replaced[name].encode("utf-8") if name in replaced else data)
+            for i, slide in enumerate(self._slides, 1):
+                zf.writestr(f"ppt/slides/slide{i}.xml", slide.to_xml() if isinstance(slide, SlideXml) else slide)
+                zf.writestr(f"ppt/slides/_rels/slide{i}.xml.rels", slide_rels)
+
+
+class PresentationWriter:
+    """与 PptxWriter 接口相同的 python-pptx 实现（逐个对象构建，较慢）"""
+
+    def __init__(self):
+        self._prs = Presentation()
+
+    def add_slide(self) -> "_PresentationSlide":
+        return _PresentationSlide(self._prs.slides.add_slide(self._prs.slide_layouts[BLANK_LAYOUT]))
+
+    def save(self, output: Union[str, BinaryIO]):
+        self._prs.save(output)
+
+
+class _PresentationSlide:
+
+    def __init__(self, slide):
+        self._slide = slide
+
+    def add_textbox(self, left: int, top: int, width: int, height: int, paragraphs: Sequence[Paragraph],
+                    word_wrap: bool = False):
+        text_frame = self._slide.shapes.add_textbox(left, top, width, height).text_frame
+        if word_wrap:
+            text_frame.word_wrap = True
+        for i, (text, style) in enumerate(paragraphs):
+            p = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+            p.text = text
+            if style is not None:
+                style.apply(p)
+
+    def add_table(self, rows: int, cols: int, left: int, top: int, width: int, height: int,
+                  cells: Sequence[Sequence[Optional[Paragraph]]], col_width: Optional[int] = None):
+        table = self._slide.shapes.add_table(rows, cols, left, top, width, height).table
+        if col_width is not None:
+            for column in table.columns:
+                column.width = Length(col_width)
+        for row_idx, row in enumerate(cells[:rows]):
+            for col_idx, cell in enumerate(row[:cols]):
+                if cell is None:
+                    continue
+                text, style = cell
+                cell_frame = table.cell(row_idx, col_idx).text_frame
+                cell_frame.text = text
+                if style is not None:
+                    style.apply(cell_frame.paragraphs[0])
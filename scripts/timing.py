@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+阶段耗时统计
+转换过程分为打开文件、页面嗅探、文本提取、表格提取、文档构建、保存等阶段，
+分别累计每个阶段的耗时，随转换结果一起返回，便于定位慢在哪一步。
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+
+class StageTimer:
+    """按阶段名累计耗时（秒）"""
+
+    def __init__(self):
+        self.stages = {}
+        self._started = time.perf_counter()
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        """统计 with 块内的耗时"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """逐个取出元素，把等待每个元素的时间计入该阶段（用于并行提取等惰性结果）"""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.perf_counter() - started)
+                return
+            self.add(name, time.perf_counter() - started)
+            yield item
+
+    def as_dict(self) -> dict:
+        """各阶段耗时及总耗时，保留 4 位小数"""
+        timings = {name: round(seconds, 4) for name, seconds in self.stages.items()}
+        timings["total"] = round(time.perf_counter() - self._started, 4)
+        return timings
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+本地共享状态数据库 - SQLite (WAL 模式)
+任务记录、结果缓存索引等需要在多个 Web 工作进程之间共享的状态保存在 SQLite 中：
+WAL 模式下读写互不阻塞，写入由 SQLite 在进程之间加锁，等待超过 busy_timeout 才报错。
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+# 写锁被其他进程占用时的最长等待时间（毫秒）
+BUSY_TIMEOUT_MS = 10000
+
+
+class StateDB:
+    """一个 SQLite 连接：同一进程内的线程共用，用锁串行化"""
+
+    def __init__(self, path: Path, schema: str):
+        """
+        Args:
+            path: 数据库文件路径
+            schema: 建表语句（CREATE TABLE IF NOT EXISTS ...，可包含多条）
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None：自动提交，需要多条语句原子执行时用 transaction()
+        self.conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_MS / 1000,
+                                    isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            # WAL 下 NORMAL 只在检查点时 fsync，断电最多丢失最近的提交，数据库不会损坏
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self.conn.executescript(schema)
+
+    def execute(self, sql: str, params=()) -> list:
+        """执行一条语句，返回所有结果行"""
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def transaction(self):
+        """写事务（BEGIN IMMEDIATE 立即取得写锁，事务内先读后写不会与其他进程冲突）"""
+        return _Transaction(self)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class _Transaction:
+    def __init__(self, db: StateDB):
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.lock.acquire()
+        try:
+            self.db.conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self.db.lock.release()
+            raise
+        return self.db.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.db.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        finally:
+            self.db.lock.release()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+上传文件流式接收
+按固定大小分块读取上传内容：小文件留在内存缓冲区，超过阈值后写入上传目录，
+同时在同一次遍历中计算 SHA-256 并检查大小上限，单个上传的内存占用只有几 MB。
+
+注意 FastAPI 在调用处理函数之前就会把整个 multipart 请求体解析到自己的临时文件中，
+处理函数内的大小检查无法提前拒绝；提前拒绝由 RequestBodyLimit 中间件在读取请求体之前完成。
+"""
+
+import io
+import os
+import uuid
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+
+class UploadTooLargeError(Exception):
+    """上传文件超过大小限制"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"文件过大，最大支持 {max_bytes // (1024 * 1024)} MB")
+        self.max_bytes = max_bytes
+
+
+class SpooledUpload:
+    """先写内存、超过阈值后落盘的上传缓冲区"""
+
+    def __init__(self, spill_dir: Path, threshold: int):
+        self.spill_dir = spill_dir
+        self.threshold = threshold
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._spill_path: Optional[Path] = None
+        self._spill = None
+
+    @property
+    def sha256(self) -> str:
+        """内容的 SHA-256 十六进制摘要"""
+        return self._hash.hexdigest()
+
+    @property
+    def in_memory(self) -> bool:
+        return self._spill_path is None
+
+    async def write(self, chunk: bytes):
+        """写入一块数据"""
+        self.size += len(chunk)
+        self._hash.update(chunk)
+
+        if self._spill is None and self.size > self.threshold:
+            # 超过阈值，把已缓冲的数据转存到磁盘
+            self._spill_path = self.spill_dir / f".{uuid.uuid4().hex}.part"
+            self._spill = await aiofiles.open(self._spill_path, 'wb')
+            await self._spill.write(self._buffer.getvalue())
+            self._buffer = None
+
+        if self._spill is not None:
+            await self._spill.write(chunk)
+        else:
+            self._buffer.write(chunk)
+
+    async def save(self, path: Path) -> Path:
+        """把上传内容保存到指定路径"""
+        if self._spill is not None:
+            await self._spill.close()
+            self._spill = None
+            os.replace(self._spill_path, path)
+            self._spill_path = None
+        else:
+            async with aiofiles.open(path, 'wb') as f:
+                await f.write(self._buffer.getvalue())
+            self._buffer = None
+        return path
+
+    async def discard(self):
+        """丢弃缓冲内容和临时文件"""
+        if self._spill is not None:
+            await self._spill.close()
+            self._spill = None
+        if self._spill_path is not None and self._spill_path.exists():
+            self._spill_path.unlink()
+        self._spill_path = None
+        self._buffer = None
+
+
+async def hash_upload(file: UploadFile, chunk_size: int = 1024 * 1024) -> str:
+    """只计算上传内容的 SHA-256（不保存），读完后回到开头"""
+    digest = hashlib.sha256()
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest()
+
+
+async def receive_upload(file: UploadFile, spill_dir: Path, max_bytes: int,
+                         chunk_size: int = 1024 * 1024, spool_threshold: int = 8 * 1024 * 1024) -> SpooledUpload:
+    """
+    分块接收上传文件
+
+    Args:
+        file: FastAPI 上传文件
+        spill_dir: 超过阈值时落盘的目录
+        max_bytes: 最大允许大小
+        chunk_size: 每次读取的块大小
+        spool_threshold: 内存缓冲阈值
+
+    Returns:
+        SpooledUpload: 接收完成的缓冲区（含大小和 SHA-256）
+    """
+    # 已知大小时提前拒绝，不读取内容
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    upload = SpooledUpload(spill_dir, spool_threshold)
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            if upload.size + len(chunk) > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            await upload.write(chunk)
+    except BaseException:
+        await upload.discard()
+        raise
+    return upload
+
+
+class RequestBodyLimit:
+    """
+    ASGI 中间件：限制上传接口的请求体大小
+
+    带 Content-Length 的请求在读取请求体之前直接返回 413；
+    分块传输（没有 Content-Length）时边接收边计数，超过上限立即中止解析并返回 413。
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Args:
+            app: 下一层 ASGI 应用
+            limits: 路径 -> 请求体字节上限（只限制这些路径的 POST 请求）
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = str(UploadTooLargeError(max_bytes))
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # 在解析请求体时抛出，FastAPI 原样返回 HTTPException（其他异常会被当作 400 解析错误）
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)